@@ -0,0 +1,54 @@
+"""
+Compare two benchmark result files produced by `benchmarks.run`.
+
+    python -m benchmarks.compare data/bench/abc123.json data/bench/def456.json --threshold 0.10
+
+Exits 1 if any stage's time metric got slower by more than the threshold.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+# lower is better for all of these
+METRICS = ("total_s", "p50_ms", "p95_ms")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    base = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    cand = json.loads(Path(args.candidate).read_text(encoding="utf-8"))
+
+    if base["meta"].get("articles") != cand["meta"].get("articles") or base["meta"].get("seed") != cand["meta"].get("seed"):
+        print("[compare] warning: corpus size/seed differ, numbers are not directly comparable")
+
+    print(f"[compare] {base['meta'].get('commit')} -> {cand['meta'].get('commit')}")
+    regressions = []
+    for stage, b in base["results"].items():
+        c = cand["results"].get(stage)
+        if c is None:
+            continue
+        for metric in METRICS:
+            if metric not in b or metric not in c or not b[metric]:
+                continue
+            ratio = c[metric] / b[metric]
+            flag = ""
+            if ratio > 1 + args.threshold:
+                flag = "  REGRESSION"
+                regressions.append((stage, metric, ratio))
+            print(f"  {stage:<24} {metric:<8} {b[metric]:>12} -> {c[metric]:>12}  x{ratio:.3f}{flag}")
+
+    if regressions:
+        print(f"[compare] {len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
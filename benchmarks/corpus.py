@@ -0,0 +1,122 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+
+BASE_URL = "https://support.optisigns.com"
+
+_WORDS = (
+    "screen display player playlist schedule content app device signage account "
+    "settings update firmware network wifi ethernet hdmi cec rs-232 remote asset "
+    "image video template widget zone layout rotation portrait landscape timer "
+    "browser kiosk url refresh cache storage sync pairing code dashboard team "
+    "user role permission folder tag report proof-of-play uptime offline online "
+    "restart reboot power volume audio caption font color background overlay"
+).split()
+
+_LABELS = ["troubleshooting", "how-to", "hardware", "apps", "integrations", "billing", "faq"]
+
+_LANGS = ["bash", "json", "python", "html", ""]
+
+
+def _sentence(rng: random.Random, min_words: int = 8, max_words: int = 22) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return words[0].capitalize() + " " + " ".join(words[1:]) + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    text = " ".join(_sentence(rng) for _ in range(rng.randint(2, 6)))
+    if rng.random() < 0.3:
+        text += f' See <a href="{BASE_URL}/hc/en-us/articles/{rng.randint(10**11, 10**12)}"><span class="wysiwyg-underline">{_sentence(rng, 2, 4)[:-1]}</span></a>.'
+    return f"<p>{text}</p>"
+
+
+def _table(rng: random.Random) -> str:
+    cols = rng.randint(2, 4)
+    rows = rng.randint(2, 8)
+    head = "".join(f"<th>{rng.choice(_WORDS).title()}</th>" for _ in range(cols))
+    body = "".join(
+        "<tr>" + "".join(f"<td>{_sentence(rng, 2, 7)}</td>" for _ in range(cols)) + "</tr>"
+        for _ in range(rows)
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _code(rng: random.Random) -> str:
+    lang = rng.choice(_LANGS)
+    lines = [f"{rng.choice(_WORDS)}_{i} = \"{rng.choice(_WORDS)}\"" for i in range(rng.randint(3, 15))]
+    cls = f' class="language-{lang}"' if lang else ""
+    return f"<pre><code{cls}>" + "\n".join(lines) + "</code></pre>"
+
+
+def _image(rng: random.Random, article_id: int) -> str:
+    n = rng.randint(1, 10**9)
+    return (
+        f'<p><img src="{BASE_URL}/hc/article_attachments/{article_id}{n}" '
+        f'alt="{_sentence(rng, 2, 5)[:-1]}" width="640" height="360"></p>'
+    )
+
+
+def _list(rng: random.Random) -> str:
+    tag = rng.choice(["ul", "ol"])
+    items = "".join(f"<li>{_sentence(rng, 4, 12)}</li>" for _ in range(rng.randint(2, 7)))
+    return f"<{tag}>{items}</{tag}>"
+
+
+def make_article_html(rng: random.Random, article_id: int) -> str:
+    """
+    Build an article body shaped like Help Center HTML: optional TOC anchor list,
+    H2/H3 sections with named anchors, prose, lists, tables, code fences and images.
+    """
+    n_sections = rng.randint(1, 8)
+    heading = "h2" if rng.random() < 0.7 else "h3"
+    anchors = [f"Section{i}" for i in range(n_sections)]
+    titles = [_sentence(rng, 2, 6)[:-1] for _ in range(n_sections)]
+
+    parts: List[str] = []
+    parts.append(f'<h3 id="h_{article_id}"><span style="color: #434343;">{_sentence(rng)}</span></h3>')
+    if n_sections > 2 and rng.random() < 0.6:
+        toc = "".join(f'<li><a href="#{a}">{t}</a></li>' for a, t in zip(anchors, titles))
+        parts.append(f"<ul>{toc}</ul>")
+    parts.append(_paragraph(rng))
+
+    for anchor, title in zip(anchors, titles):
+        parts.append(f'<p><a name="{anchor}"></a></p>')
+        parts.append(f"<{heading}>{title}</{heading}>")
+        for _ in range(rng.randint(1, 6)):
+            r = rng.random()
+            if r < 0.45:
+                parts.append(_paragraph(rng))
+            elif r < 0.6:
+                parts.append(_list(rng))
+            elif r < 0.72:
+                parts.append(_table(rng))
+            elif r < 0.84:
+                parts.append(_code(rng))
+            elif r < 0.95:
+                parts.append(_image(rng, article_id))
+            else:
+                parts.append("<p>&nbsp;</p><script>console.log('x')</script>")
+
+    return "".join(parts)
+
+
+def iter_articles(n: int, *, seed: int = 0, start_id: int = 360000000000) -> Iterator[Dict]:
+    """
+    Yield `n` synthetic article dicts with the fields the pipeline reads from the
+    Help Center API. The same (n, seed) always produces the same corpus.
+    """
+    rng = random.Random(seed)
+    base_ts = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        article_id = start_id + i
+        title = _sentence(rng, 3, 9)[:-1]
+        updated = base_ts + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        yield {
+            "id": article_id,
+            "title": title,
+            "html_url": f"{BASE_URL}/hc/en-us/articles/{article_id}",
+            "updated_at": updated.isoformat().replace("+00:00", "Z"),
+            "label_names": rng.sample(_LABELS, rng.randint(0, 3)),
+            "locale": "en-us",
+            "body": make_article_html(rng, article_id),
+        }
@@ -0,0 +1,209 @@
+"""
+Crawler memory benchmark: peak RSS of `list_articles` vs streaming `iter_articles`.
+
+    python -m benchmarks.crawler_memory
+    python -m benchmarks.crawler_memory --sizes 1000,10000,50000 --pad-kb 64
+
+Serves synthetic Help Center article pages (Zendesk shape, `next_page` links) from a
+local HTTP server and crawls them in a fresh subprocess per (mode, corpus size), so each
+measurement has its own high-water mark. Modes:
+
+    list          list_articles: every page parsed whole, all articles kept
+    stream        iter_articles(fields=None): articles yielded one by one, all fields
+    stream-fields iter_articles with the default ARTICLE_FIELDS
+    stream-cached iter_articles through an HttpCache (the default configuration), crawled
+                  twice: pages are stored on the first pass and answered with 304s on the second
+
+Streaming peak RSS should stay flat as the corpus grows; `list` grows linearly.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.corpus import iter_articles
+from benchmarks.run import _git_commit
+
+MODES = ("list", "stream", "stream-fields", "stream-cached")
+
+START_ID = 360000000000
+
+
+def _rss_mb() -> float:
+    """
+    Peak RSS of this process so far. Prefers VmHWM: ru_maxrss survives fork+exec on Linux,
+    so a child would report the (server) parent's high-water mark.
+    """
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def make_server(n: int, per_page: int, pad_kb: int, seed: int) -> ThreadingHTTPServer:
+    """Local server for /api/v2/help_center/<locale>/articles.json?page=N, generated on the fly."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            etag = f'"{n}-{per_page}-{pad_kb}-{seed}-{page}"'  # pages never change for one server
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            first = (page - 1) * per_page
+            count = max(0, min(per_page, n - first))
+            articles = list(iter_articles(count, seed=seed + page, start_id=START_ID + first))
+            for a in articles:
+                a.update(author_id=1, section_id=2, vote_sum=0, comments_disabled=False)  # fields the pipeline ignores
+                if pad_kb:
+                    a["body"] += "<p>" + "x" * (pad_kb * 1024) + "</p>"
+            next_page = None
+            if first + count < n:
+                host, port = self.server.server_address[:2]
+                next_page = f"http://{host}:{port}{url.path}?page={page + 1}&per_page={per_page}"
+            payload = {
+                "articles": articles,
+                "next_page": next_page,
+                "count": n,
+                "page": page,
+                "page_count": -(-n // per_page),
+                "per_page": per_page,
+            }
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+
+def child(mode: str, base_url: str, n: int) -> Dict:
+    """Crawl in this process and report peak RSS above the post-import baseline."""
+    from services.crawler import iter_articles as crawl_iter
+    from services.crawler import list_articles
+    from services.http_cache import HttpCache
+
+    baseline = _rss_mb()
+    t0 = time.perf_counter()
+    count, body_bytes = 0, 0
+    if mode == "list":
+        articles = list_articles(base_url, "en-us", limit=n)
+        for a in articles:
+            count += 1
+            body_bytes += len(a.get("body") or "")
+    elif mode == "stream-cached":
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = HttpCache(tmp, max_bytes=1 << 40)
+            for _ in range(2):  # fill, then revalidate
+                for a in crawl_iter(base_url, "en-us", limit=n, cache=cache):
+                    count += 1
+                    body_bytes += len(a.get("body") or "")
+            if cache.stats["hits"] == 0:
+                raise RuntimeError(f"second crawl was not served from the cache: {cache.stats}")
+    else:
+        kwargs = {"fields": None} if mode == "stream" else {}
+        for a in crawl_iter(base_url, "en-us", limit=n, **kwargs):
+            count += 1
+            body_bytes += len(a.get("body") or "")
+    return {
+        "articles": count,
+        "body_mb": round(body_bytes / 1e6, 2),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "peak_over_baseline_mb": round(_rss_mb() - baseline, 1),
+    }
+
+
+def measure(mode: str, base_url: str, n: int) -> Dict:
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.crawler_memory", "--child", mode, "--url", base_url, "--sizes", str(n)],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} n={n} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,5000,20000", help="comma separated corpus sizes")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"comma separated subset of {MODES}")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--pad-kb", type=int, default=0, help="extra HTML per article body, to simulate huge articles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="results JSON path (default data/bench/crawler-memory-<commit>.json)")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.child:
+        print(json.dumps(child(args.child, args.url, sizes[0])))
+        return 0
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {sorted(unknown)}")
+
+    results: Dict[str, Dict[str, Dict]] = {m: {} for m in modes}
+    for n in sizes:
+        server = make_server(n, args.per_page, args.pad_kb, args.seed)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = "http://%s:%d" % server.server_address[:2]
+        try:
+            for mode in modes:
+                res = measure(mode, base_url, n)
+                results[mode][str(n)] = res
+                print(f"[crawler-memory] mode={mode} n={n} {res}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "python": sys.version.split()[0],
+            "sizes": sizes,
+            "per_page": args.per_page,
+            "pad_kb": args.pad_kb,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    out = Path(args.out or f"data/bench/crawler-memory-{commit}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[crawler-memory] wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Import-time guard for the entry points, based on `python -X importtime`.
+
+    python -m benchmarks.importtime --out data/bench/importtime.json
+    python -m benchmarks.importtime --baseline data/bench/importtime.json --threshold 0.5
+
+For each entry module, checks that none of the heavy, stage-specific dependencies are
+imported eagerly and that the cumulative import time (best of --repeat runs) stays under
+the budget and, with --baseline, within --threshold of the recorded time. Import times vary
+by 50% between runs on shared CI machines, so the absolute budget is only a backstop; the
+eager-import check is the precise guard. Exits 1 on any violation.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ENTRY_MODULES = ("main", "ingest_one", "gc_orphans", "serve", "search_chunks")
+
+# Only loaded by the stage that needs them (conversion, GCS state, process pool)
+LAZY_MODULES = ("bs4", "html5lib", "markdownify", "google.cloud.storage", "multiprocessing")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure(module: str) -> Tuple[float, Dict[str, int]]:
+    """
+    Import `module` in a fresh interpreter. Returns (cumulative_ms, {module: cumulative_us})
+    for everything imported by `module` (interpreter startup imports such as `site` excluded).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    # importtime prints children before their parent; a top-level line (one space of
+    # indent) closes the block of nested imports listed since the previous one
+    block: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        name, cumulative = m.group(4), int(m.group(2))
+        block[name] = cumulative
+        if len(m.group(3)) == 1:
+            if name == module:
+                return cumulative / 1000, block
+            block = {}
+    return 0.0, {}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(ENTRY_MODULES))
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="max cumulative import time per entry module")
+    parser.add_argument("--baseline", default=None, help="results JSON of an earlier --out run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown vs --baseline (0.5 = +50%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="take the best of N runs to reduce noise")
+    parser.add_argument("--top", type=int, default=5, help="print the N slowest imports of each module")
+    parser.add_argument("--out", default=None, help="optional JSON results path")
+    args = parser.parse_args(argv)
+
+    baseline: Dict[str, Dict] = {}
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+
+    failures: List[str] = []
+    results: Dict[str, Dict] = {}
+    for module in [m.strip() for m in args.modules.split(",") if m.strip()]:
+        runs = [measure(module) for _ in range(max(1, args.repeat))]
+        best_ms, imported = min(runs, key=lambda r: r[0])
+
+        eager = [m for m in LAZY_MODULES if m in imported]
+        results[module] = {"import_ms": round(best_ms, 2), "eager_heavy_modules": eager}
+        print(f"[importtime] {module} {best_ms:.1f}ms (best of {len(runs)})")
+
+        children = sorted(((us, name) for name, us in imported.items() if name != module), reverse=True)
+        for us, name in children[: args.top]:
+            print(f"    {us / 1000:8.1f}ms  {name}")
+
+        if eager:
+            failures.append(f"{module} eagerly imports {eager}")
+        if best_ms > args.budget_ms:
+            failures.append(f"{module} import {best_ms:.1f}ms > budget {args.budget_ms:.0f}ms")
+        base_ms = (baseline.get(module) or {}).get("import_ms")
+        if base_ms and best_ms > base_ms * (1 + args.threshold):
+            failures.append(f"{module} import {best_ms:.1f}ms > baseline {base_ms:.1f}ms +{args.threshold:.0%}")
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({"budget_ms": args.budget_ms, "results": results}, indent=2), encoding="utf-8")
+
+    for f in failures:
+        print(f"[importtime] FAIL {f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
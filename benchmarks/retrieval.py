@@ -0,0 +1,174 @@
+"""
+Retrieval benchmark for chunking choices, using the local BM25 index (no vector store).
+
+    python -m benchmarks.retrieval --md-dir data/md --questions data/questions.jsonl
+    python -m benchmarks.retrieval --articles 2000 --target-chars 1500 --no-toc
+
+Questions are JSONL, one object per line:
+    {"question": "...", "article_id": "123"}            # or "article_ids": [...]
+    {"question": "...", "chunk_ids": ["123:0002:0"]}    # chunk-level relevance
+Without --questions (synthetic corpus or md dir), questions are generated from
+article titles and sentences sampled from the articles.
+
+Reports index build time, allocation peak and size, query latency, recall@k and MRR,
+written as JSON like `benchmarks.run`.
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.corpus import iter_articles
+from benchmarks.run import _git_commit, _summarize
+from search_chunks import add_chunking_args, chunk_kwargs_from_args, chunk_md_file
+from services.chunk import Chunk, chunk_markdown
+from services.converter import article_to_markdown
+from services.search_index import Bm25Index
+
+KS = (1, 5, 10)
+
+_SENTENCE_RE = re.compile(r"[A-Z][^.!?\n|#`]{30,200}[.!?]")
+
+
+def load_corpus(args) -> List[Tuple[str, List[Chunk], str]]:
+    """[(article_key, chunks, markdown)] from --md-dir (translations keyed "<locale>/<id>") or a synthetic corpus."""
+    kwargs = chunk_kwargs_from_args(args)
+    out = []
+    if args.md_dir:
+        md_root = Path(args.md_dir)
+        for fp in sorted(md_root.rglob("*.md")):
+            article_id, chunks = chunk_md_file(fp, md_root, **kwargs)
+            out.append((article_id, chunks, fp.read_text(encoding="utf-8")))
+    else:
+        for a in iter_articles(args.articles, seed=args.seed):
+            md = article_to_markdown(a)
+            out.append((str(a["id"]), chunk_markdown(md, **kwargs), md))
+    return out
+
+
+def generate_questions(corpus: List[Tuple[str, List[Chunk], str]], n: int, seed: int) -> List[Dict]:
+    """Title and body-sentence questions, relevant article = the one they came from."""
+    rng = random.Random(seed)
+    picks = rng.sample(corpus, min(n, len(corpus)))
+    questions = []
+    for i, (article_id, chunks, md) in enumerate(picks):
+        if not chunks:
+            continue
+        if i % 2 == 0:
+            q = chunks[0].title
+        else:
+            # sentences from the body only (skip front matter/header lines)
+            body = md.split("Article URL:", 1)[-1]
+            sentences = _SENTENCE_RE.findall(body)
+            q = rng.choice(sentences) if sentences else chunks[0].title
+        questions.append({"question": q, "article_ids": [article_id]})
+    return questions
+
+
+def load_questions(path: str) -> List[Dict]:
+    out = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            q = json.loads(line)
+            if "article_id" in q:
+                q["article_ids"] = [str(q.pop("article_id"))]
+            out.append(q)
+    return out
+
+
+def evaluate(idx: Bm25Index, questions: List[Dict]) -> Dict:
+    kmax = max(KS)
+    durations: List[float] = []
+    hits_at = {k: 0 for k in KS}
+    rr_sum = 0.0
+
+    for q in questions:
+        t0 = time.perf_counter()
+        hits = idx.search(q["question"], k=kmax)
+        durations.append(time.perf_counter() - t0)
+
+        if q.get("chunk_ids"):
+            relevant, got = set(q["chunk_ids"]), [h.chunk_id for h in hits]
+        else:
+            relevant = {str(a) for a in q.get("article_ids", [])}
+            got = list(dict.fromkeys(h.article_id for h in hits))  # article-level ranking
+
+        rank = next((i for i, x in enumerate(got, 1) if x in relevant), None)
+        if rank:
+            rr_sum += 1 / rank
+            for k in KS:
+                if rank <= k:
+                    hits_at[k] += 1
+
+    n = len(questions)
+    res = {"questions": n, "mrr": round(rr_sum / n, 4) if n else 0.0}
+    for k in KS:
+        res[f"recall@{k}"] = round(hits_at[k] / n, 4) if n else 0.0
+    res["latency"] = _summarize(durations, sum(durations))
+    return res
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--md-dir", default=None, help="converted articles (default: synthetic corpus)")
+    parser.add_argument("--articles", type=int, default=1000, help="synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--questions", default=None, help="labelled questions JSONL")
+    parser.add_argument("--n-questions", type=int, default=200, help="generated questions when --questions is not given")
+    parser.add_argument("--out", default=None, help="results JSON path (default data/bench/retrieval-<commit>.json)")
+    add_chunking_args(parser)
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    idx = Bm25Index()
+    for article_id, chunks, _ in corpus:
+        idx.add_article(article_id, chunks)
+    build_s = time.perf_counter() - t0
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    index = {
+        "articles": len(corpus),
+        "docs": len(idx),
+        "terms": len(idx.terms),
+        "build_s": round(build_s, 4),
+        "build_peak_mb": round(build_peak / 1e6, 2),
+        "postings_mb": round(idx.nbytes() / 1e6, 3),
+    }
+    print(f"[retrieval] index {index}")
+
+    questions = load_questions(args.questions) if args.questions else generate_questions(corpus, args.n_questions, args.seed)
+    quality = evaluate(idx, questions)
+    print(f"[retrieval] quality { {k: v for k, v in quality.items() if k != 'latency'} }")
+    print(f"[retrieval] latency {quality['latency']}")
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "python": sys.version.split()[0],
+            "source": args.md_dir or f"synthetic:{args.articles}:{args.seed}",
+            "questions": args.questions or f"generated:{args.n_questions}",
+            "chunking": chunk_kwargs_from_args(args),
+        },
+        "results": {"index": index, "retrieval": quality},
+    }
+    out = Path(args.out or f"data/bench/retrieval-{commit}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[retrieval] wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
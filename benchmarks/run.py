@@ -0,0 +1,231 @@
+"""
+Offline benchmark for the convert -> chunk -> delta pipeline over a synthetic corpus.
+
+    python -m benchmarks.run --articles 1000
+    python -m benchmarks.run --articles 100000 --stages chunk_markdown,collect_delta_articles
+
+Results are written as JSON (default: data/bench/<commit>.json) so two commits can be
+compared with `python -m benchmarks.compare old.json new.json`.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.corpus import iter_articles
+from services.chunk import chunk_markdown, write_chunks_for_md
+from services.converter import article_to_markdown, convert_article_to_md, html_to_markdown
+from services.uploader import collect_delta_articles, compute_article_hash, compute_chunks_hash, save_state
+
+STAGES = ("html_to_markdown", "chunk_markdown", "collect_delta_articles", "pipeline", "pipeline_memory")
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        commit = out.stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _summarize(durations: List[float], total_s: float, n_bytes: int = 0) -> Dict:
+    """Summarize per-item durations (seconds) into the stats stored in the results file."""
+    n = len(durations)
+    ordered = sorted(durations)
+    res = {
+        "n": n,
+        "total_s": round(total_s, 4),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 4) if n else 0.0,
+        "p50_ms": round(ordered[n // 2] * 1000, 4) if n else 0.0,
+        "p95_ms": round(ordered[min(n - 1, int(n * 0.95))] * 1000, 4) if n else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 4) if n else 0.0,
+        "items_per_s": round(n / total_s, 2) if total_s else 0.0,
+    }
+    if n_bytes:
+        res["mb_per_s"] = round(n_bytes / 1e6 / total_s, 3) if total_s else 0.0
+    return res
+
+
+def _warm_up(seed: int) -> None:
+    """Convert one untimed article, so the lazy bs4/html5lib/markdownify imports are not in the first timing."""
+    html_to_markdown(next(iter_articles(1, seed=seed))["body"])
+
+
+def bench_html_to_markdown(n: int, seed: int) -> Dict:
+    _warm_up(seed)
+    durations, n_bytes = [], 0
+    for a in iter_articles(n, seed=seed):
+        body = a["body"]
+        n_bytes += len(body)
+        t0 = time.perf_counter()
+        html_to_markdown(body)
+        durations.append(time.perf_counter() - t0)
+    return _summarize(durations, sum(durations), n_bytes)
+
+
+def bench_pipeline(n: int, seed: int, work_dir: Path) -> Dict:
+    """convert_article_to_md + write_chunks_for_md + collect_delta_articles (everything but uploads)."""
+    md_dir, chunk_dir = work_dir / "md", work_dir / "chunks"
+    durations, n_chunks = [], 0
+    _warm_up(seed)
+
+    start = time.perf_counter()
+    for a in iter_articles(n, seed=seed):
+        t0 = time.perf_counter()
+        md_path = convert_article_to_md(a, out_dir=str(md_dir), allow_overwrite=True)
+        n_chunks += write_chunks_for_md(md_path, chunk_dir=str(chunk_dir))
+        durations.append(time.perf_counter() - t0)
+    added, _, _, _ = collect_delta_articles(str(chunk_dir), str(work_dir / "state.json"))
+    total = time.perf_counter() - start
+
+    res = _summarize(durations, total)
+    res["chunks"] = n_chunks
+    res["delta_added"] = len(added)
+    return res
+
+
+def bench_pipeline_memory(n: int, seed: int) -> Dict:
+    """article_to_markdown + chunk_markdown + compute_chunks_hash, the upload path with no files written."""
+    durations, n_chunks = [], 0
+    _warm_up(seed)
+    for a in iter_articles(n, seed=seed):
+        t0 = time.perf_counter()
+        chunks = chunk_markdown(article_to_markdown(a))
+        compute_chunks_hash([ch.text for ch in chunks])
+        durations.append(time.perf_counter() - t0)
+        n_chunks += len(chunks)
+    res = _summarize(durations, sum(durations))
+    res["chunks"] = n_chunks
+    return res
+
+
+def bench_chunk_markdown(md_dir: Path) -> Dict:
+    durations, n_bytes, n_chunks = [], 0, 0
+    for fp in sorted(md_dir.glob("*.md")):
+        text = fp.read_text(encoding="utf-8")
+        n_bytes += len(text)
+        t0 = time.perf_counter()
+        n_chunks += len(chunk_markdown(text))
+        durations.append(time.perf_counter() - t0)
+    res = _summarize(durations, sum(durations), n_bytes)
+    res["chunks"] = n_chunks
+    return res
+
+
+def bench_collect_delta(work_dir: Path) -> Dict:
+    """
+    Seed a state where ~1/2 of the articles are unchanged, ~1/4 changed and ~1/4 new,
+    then time a single `collect_delta_articles` scan of the chunk tree.
+    """
+    chunk_dir = work_dir / "chunks"
+    state_path = work_dir / "delta_state.json"
+    state: Dict = {}
+    for i, d in enumerate(sorted(p for p in chunk_dir.iterdir() if p.is_dir())):
+        bucket = i % 4
+        if bucket in (0, 1):
+            state[d.name] = {"hash": compute_article_hash(d), "file_ids": []}
+        elif bucket == 2:
+            state[d.name] = {"hash": "stale", "file_ids": []}
+    save_state(state, str(state_path))
+
+    t0 = time.perf_counter()
+    added, updated, skipped, _ = collect_delta_articles(str(chunk_dir), str(state_path))
+    total = time.perf_counter() - t0
+
+    n = len(added) + len(updated) + len(skipped)
+    return {
+        "n": n,
+        "total_s": round(total, 4),
+        "items_per_s": round(n / total, 2) if total else 0.0,
+        "added": len(added),
+        "updated": len(updated),
+        "skipped": len(skipped),
+    }
+
+
+def run(n: int, seed: int, stages: List[str], work_dir: Path) -> Dict:
+    results: Dict[str, Dict] = {}
+
+    if "html_to_markdown" in stages:
+        results["html_to_markdown"] = bench_html_to_markdown(n, seed)
+        print(f"[bench] html_to_markdown {results['html_to_markdown']}")
+
+    # pipeline always runs when a later stage needs its md/chunk tree
+    if {"pipeline", "chunk_markdown", "collect_delta_articles"} & set(stages):
+        pipeline = bench_pipeline(n, seed, work_dir)
+        if "pipeline" in stages:
+            results["pipeline"] = pipeline
+            print(f"[bench] pipeline {pipeline}")
+
+    if "pipeline_memory" in stages:
+        results["pipeline_memory"] = bench_pipeline_memory(n, seed)
+        print(f"[bench] pipeline_memory {results['pipeline_memory']}")
+
+    if "chunk_markdown" in stages:
+        results["chunk_markdown"] = bench_chunk_markdown(work_dir / "md")
+        print(f"[bench] chunk_markdown {results['chunk_markdown']}")
+
+    if "collect_delta_articles" in stages:
+        results["collect_delta_articles"] = bench_collect_delta(work_dir)
+        print(f"[bench] collect_delta_articles {results['collect_delta_articles']}")
+
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=1000, help="synthetic corpus size (1k-100k)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma separated subset of {STAGES}")
+    parser.add_argument("--out", default=None, help="results JSON path (default data/bench/<commit>.json)")
+    parser.add_argument("--work-dir", default=None, help="keep generated md/chunk trees here instead of a temp dir")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {sorted(unknown)}")
+
+    commit = _git_commit()
+    print(f"[bench] commit={commit} articles={args.articles} seed={args.seed} stages={stages}")
+
+    if args.work_dir:
+        work_dir = Path(args.work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        results = run(args.articles, args.seed, stages, work_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+            results = run(args.articles, args.seed, stages, Path(tmp))
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "articles": args.articles,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    out = Path(args.out or f"data/bench/{commit}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[bench] wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
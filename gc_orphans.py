@@ -0,0 +1,43 @@
+import argparse
+
+from services.state_store import StateStore
+from services.vector_store_gc import gc_vector_store
+from main import make_state_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove vector store files not referenced by the state.")
+    parser.add_argument(
+        "--state",
+        help="diff against this local state file instead of the pipeline's state (GCS when GCS_BUCKET is set)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only list orphans")
+    parser.add_argument(
+        "--include-unattached",
+        action="store_true",
+        help=(
+            "also delete chunk Files (<id>_NNNN.md) attached to no vector store. Files are shared "
+            "org-wide: a chunk File another deployment uploaded but never attached (e.g. after a "
+            "crash) is indistinguishable from ours and is deleted too"
+        ),
+    )
+    parser.add_argument(
+        "--min-age",
+        type=int,
+        default=3600,
+        help="only remove files older than this many seconds (newer ones may belong to a run in progress)",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    gc_vector_store(
+        StateStore(args.state) if args.state else make_state_store(),
+        dry_run=args.dry_run,
+        include_unattached_files=args.include_unattached,
+        min_age_sec=args.min_age,
+        max_workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,88 @@
+import argparse
 from pathlib import Path
-import os
-import shutil
+from typing import List, Optional
 
-from services.crawler import fetch_article_by_id
-from services.converter import convert_article_to_md
-from services.uploader import upload_delta_articles 
-from services.chunk import chunk_markdown
+from services.crawler import fetch_articles_by_ids
+from services.http_cache import HttpCache
+from services.state_store import StateStore
+from services.uploader import upload_chunked_articles
+from main import LOCALE, LOCALES, WORKERS, count_chunks, iter_convert_and_chunk, make_http_cache, make_job, make_state_store
 
-OUT_DIR = "data/md"
-CHUNK_DIR = "data/chunks"
-STATE_PATH = "data/state.json"
 
+def read_ids(ids: List[str], ids_file: str | None) -> List[str]:
+    out = list(ids)
+    if ids_file:
+        for line in Path(ids_file).read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                out.extend(x for x in line.replace(",", " ").split() if x)
+    return out
 
-def write_chunks_for_md(md_path: Path, chunk_dir: str = "data/chunks") -> int:
-    md_text = md_path.read_text(encoding="utf-8")
-    chunks = chunk_markdown(md_text)
 
-    article_id = chunks[0].article_id if chunks and chunks[0].article_id else md_path.stem.split("-")[0]
+def ingest(
+    article_ids: List[str],
+    locale: str = LOCALE,
+    force: bool = False,
+    workers: int = WORKERS,
+    state_store: Optional[StateStore] = None,
+    cache: Optional[HttpCache] = None,
+) -> None:
+    """
+    Fetch -> convert -> chunk -> upload just these articles, from memory; no chunk tree
+    is scanned. Results are merged into the same state as the daily run (see
+    `main.make_state_store`), so this can run next to it or concurrently with itself.
+    `locale` must be one of the configured LOCALES (HC_LOCALES).
 
-    out_root = Path(chunk_dir) / str(article_id)
+    A long-running caller passes its own `state_store` and `cache` and saves the cache;
+    otherwise they are created (and the cache saved) for this call.
+    """
+    if locale not in LOCALES:
+        raise ValueError(f"locale {locale!r} is not configured (HC_LOCALES={','.join(LOCALES)})")
 
-    if out_root.exists():
-        shutil.rmtree(out_root)
-    out_root.mkdir(parents=True, exist_ok=True)
+    own_cache = cache is None
+    if own_cache:
+        cache = make_http_cache()
+    try:
+        articles = fetch_articles_by_ids(article_ids, locale=locale, cache=cache)
+    finally:
+        if own_cache and cache is not None:
+            cache.save()
+    print(f"[ingest] locale={locale} requested={len(article_ids)} fetched={len(articles)}")
+    if not articles:
+        return
 
-    for i, ch in enumerate(chunks, 1):
-        out_file = out_root / f"{article_id}_{i:04d}.md"
-        out_file.write_text(ch.text, encoding="utf-8")
-
-    return len(chunks)
+    totals = {"articles": 0, "chunks": 0}
+    try:
+        upload_chunked_articles(
+            count_chunks(iter_convert_and_chunk([make_job(a, locale) for a in articles], workers), totals),
+            state_store=state_store or make_state_store(),
+            force=force,
+        )
+    finally:
+        print(f"[ingest] chunked_articles={totals['articles']} total_chunks={totals['chunks']}")
 
 
 def main():
-    article_id = "360051014713"
-    a = fetch_article_by_id(article_id, locale="en-us")
+    from services.profiling import add_profile_args, profiled
+
+    parser = argparse.ArgumentParser(description="Ingest specific Help Center articles right away.")
+    parser.add_argument("ids", nargs="*", help="article ids")
+    parser.add_argument("--file", help="file with article ids (one per line, commas/spaces ok, # comments)")
+    parser.add_argument("--locale", default=LOCALE, help="one of the configured HC_LOCALES")
+    parser.add_argument("--force", action="store_true", help="re-upload even if chunks are unchanged")
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    ids = read_ids(args.ids, args.file)
+    if not ids:
+        parser.error("no article ids given")
+    if args.locale not in LOCALES:
+        parser.error(f"locale {args.locale!r} is not in HC_LOCALES ({','.join(LOCALES)})")
 
-    md_path = convert_article_to_md(a, out_dir=OUT_DIR, allow_overwrite=True)
-    write_chunks_for_md(Path(md_path), chunk_dir=CHUNK_DIR)
+    import main as pipeline
 
-    upload_delta_articles(chunk_root=CHUNK_DIR, state_path=STATE_PATH)
+    with profiled(args, pipeline, WORKERS) as workers:
+        ingest(ids, locale=args.locale, force=args.force, workers=workers)
 
 if __name__ == "__main__":
     main()
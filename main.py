@@ -1,13 +1,32 @@
-import shutil
+from collections import deque
 from datetime import datetime, timezone
+from itertools import chain, islice
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
 import os
-
-from services.crawler import list_articles
-from services.converter import convert_article_to_md
-from services.uploader import load_state, save_state, upload_delta_articles
-from services.chunk import chunk_markdown
-from services.state_store_gcs import load_state_from_gcs, save_state_to_gcs
+import sys
+
+from services.crawler import iter_articles_multi, list_articles
+from services.http_cache import HttpCache
+from services.converter import article_md_filename, article_to_markdown
+from services.uploader import upload_chunked_articles
+from services.chunk import Chunk, chunk_markdown, write_chunks
+from services.state_store import StateStore
+
+def _cpu_limit() -> int:
+    """
+    CPUs this process may use: the affinity mask, lowered to the cgroup v2 quota when one
+    is set (`docker run --cpus`). os.cpu_count() reports the host's CPUs in a container.
+    """
+    n = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            n = min(n, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return n
 
 URL = "https://support.optisigns.com"
 LOCALE = "en-us"
@@ -15,27 +34,21 @@ OUT_DIR = "data/md"
 CHUNK_DIR = "data/chunks"
 STATE_PATH = "data/state.json"
 
-GCS_BUCKET = os.getenv("GCS_BUCKET")
-GCS_BLOB = os.getenv("GCS_BLOB", "optibot/state.json")
-
-
-def write_chunks_for_md(md_path: Path, chunk_dir: str = "data/chunks") -> int:
-    md_text = md_path.read_text(encoding="utf-8")
-    chunks = chunk_markdown(md_text)
-
-    article_id = chunks[0].article_id if chunks and chunks[0].article_id else md_path.stem.split("-")[0]
-
-    out_root = Path(chunk_dir) / str(article_id)
+# Comma separated, e.g. HC_LOCALES=en-us,fr,de. LOCALE keeps the original layout; other
+# locales get a <locale>/ level in md/chunk dirs and state keys "<locale>/<article_id>".
+LOCALES = [l.strip() for l in os.getenv("HC_LOCALES", LOCALE).split(",") if l.strip()]
+# Size of the process pool shared by convert/chunk work across all locales. Every worker
+# imports bs4/html5lib/markdownify, so the default stays small for scheduled containers.
+WORKERS = int(os.getenv("WORKERS", "0")) or min(_cpu_limit(), 4)
+# Chunks are uploaded from memory; EXPORT_FILES=1 also writes data/md and data/chunks for debugging
+EXPORT_FILES = os.getenv("EXPORT_FILES", "0") == "1"
 
-    if out_root.exists():
-        shutil.rmtree(out_root)
-    out_root.mkdir(parents=True, exist_ok=True)
+# Conditional-request cache for Help Center GETs; HTTP_CACHE_DIR="" disables it
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "data/http_cache")
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "256"))
 
-    for i, ch in enumerate(chunks, 1):
-        out_file = out_root / f"{article_id}_{i:04d}.md"
-        out_file.write_text(ch.text, encoding="utf-8")
-
-    return len(chunks)
+GCS_BUCKET = os.getenv("GCS_BUCKET")
+GCS_BLOB = os.getenv("GCS_BLOB", "optibot/state.json")
 
 
 def parse_ts(ts: str) -> datetime:
@@ -44,43 +57,167 @@ def parse_ts(ts: str) -> datetime:
 def fetch_articles():
     return list_articles(URL, LOCALE)
 
-def run_once():
-    articles = fetch_articles()
-    if not articles:
-        print("[run] no articles fetched")
+def make_http_cache() -> Optional[HttpCache]:
+    if not HTTP_CACHE_DIR:
+        return None
+    return HttpCache(HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024)
+
+def make_state_store() -> StateStore:
+    """The state shared by the daily run, ingest_one, serve and gc_orphans (GCS when GCS_BUCKET is set)."""
+    return StateStore(STATE_PATH, gcs_bucket=GCS_BUCKET, gcs_blob=GCS_BLOB)
+
+def is_default_locale(locale: str) -> bool:
+    return locale == LOCALE
+
+def locale_dirs(locale: str) -> Tuple[str, str]:
+    """(md_dir, chunk_dir) for a locale; the default locale keeps the original layout."""
+    if is_default_locale(locale):
+        return OUT_DIR, CHUNK_DIR
+    return f"{OUT_DIR}/{locale}", f"{CHUNK_DIR}/{locale}"
+
+def article_key(locale: str, article_id: int | str) -> str:
+    """
+    State key / chunk dir of an article, relative to CHUNK_DIR. Default-locale articles keep
+    their bare id whatever HC_LOCALES is, so enabling more locales never re-keys (and
+    re-uploads) existing entries; other locales are "<locale>/<article_id>".
+    """
+    return str(article_id) if is_default_locale(locale) else f"{locale}/{article_id}"
+
+def get_last_updated(state: Dict, locale: str) -> Optional[str]:
+    if is_default_locale(locale):
+        return state.get("last_updated")
+    return (state.get("last_updated_by_locale") or {}).get(locale)
+
+def set_last_updated(state: Dict, locale: str, ts: str) -> None:
+    if is_default_locale(locale):
+        state["last_updated"] = ts
+    else:
+        state.setdefault("last_updated_by_locale", {})[locale] = ts
+
+def _convert_and_chunk(job: Tuple[dict, str, str, str, bool]) -> Tuple[str, List[Chunk]]:
+    article, key, out_dir, chunk_dir, export = job
+    md_text = article_to_markdown(article)
+    chunks = chunk_markdown(md_text)
+    if export:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        (Path(out_dir) / article_md_filename(article)).write_text(md_text, encoding="utf-8")
+        write_chunks(chunks, str(article["id"]), chunk_dir)
+    return key, chunks
+
+def make_job(article: dict, locale: str) -> Tuple[dict, str, str, str, bool]:
+    out_dir, chunk_dir = locale_dirs(locale)
+    return article, article_key(locale, article["id"]), out_dir, chunk_dir, EXPORT_FILES
+
+def iter_convert_and_chunk(jobs: Iterable[Tuple[dict, str, str, str, bool]], workers: int = WORKERS) -> Iterator[Tuple[str, List[Chunk]]]:
+    """
+    Yield (article_key, chunks) for every job, in order, converting on one shared process
+    pool. `jobs` may be a lazy iterator (e.g. a streaming crawl); at most a few jobs per
+    worker are in flight, so articles are not all held in memory at once.
+    """
+    if isinstance(jobs, list):
+        workers = min(workers, len(jobs))
+    jobs = iter(jobs)
+    head = list(islice(jobs, 2))
+    if workers <= 1 or len(head) <= 1:
+        yield from map(_convert_and_chunk, chain(head, jobs))
         return
 
-    state = load_state(STATE_PATH)
-    if GCS_BUCKET:
-        state = load_state_from_gcs(GCS_BUCKET, GCS_BLOB, STATE_PATH)
-    last_updated = state.get("last_updated")
+    # pulls in multiprocessing; only needed here
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # crawl threads are already running when the pool starts; do not fork them
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        pending = deque()
+        for job in chain(head, jobs):
+            pending.append(pool.submit(_convert_and_chunk, job))
+            if len(pending) >= 4 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def count_chunks(items: Iterator[Tuple[str, List[Chunk]]], totals: Dict[str, int]) -> Iterator[Tuple[str, List[Chunk]]]:
+    for key, chunks in items:
+        totals["articles"] += 1
+        totals["chunks"] += len(chunks)
+        yield key, chunks
+
+def iter_target_jobs(
+    articles: Iterable[Tuple[str, dict]],
+    state: Dict,
+    fetched: Dict[str, int],
+    targets: Dict[str, int],
+    max_updated: Dict[str, datetime],
+) -> Iterator[Tuple[dict, str, str, str, bool]]:
+    """
+    Jobs for the (locale, article) stream that changed since each locale's last run, counting
+    fetched/target articles and tracking the newest updated_at per locale on the way.
+    """
+    cutoffs = {}
+    for locale in LOCALES:
+        last_updated = get_last_updated(state, locale)
+        cutoffs[locale] = parse_ts(last_updated) if last_updated else None
+
+    for locale, a in articles:
+        fetched[locale] = fetched.get(locale, 0) + 1
+        updated = parse_ts(a["updated_at"]) if "updated_at" in a else None
+        if updated and (locale not in max_updated or updated > max_updated[locale]):
+            max_updated[locale] = updated
+
+        cutoff = cutoffs.get(locale)
+        if cutoff is not None and not (updated and updated > cutoff):
+            continue  # first run (no cutoff) takes everything
+        targets[locale] = targets.get(locale, 0) + 1
+        yield make_job(a, locale)
+
+def run_once(workers: int = WORKERS):
+    store = make_state_store()
+    state = store.load()
+
+    # crawl -> filter -> convert/chunk -> upload is one stream: articles are parsed off each
+    # page as it downloads and dropped once uploaded
+    cache = make_http_cache()
+    fetched: Dict[str, int] = {}
+    targets: Dict[str, int] = {}
+    max_updated: Dict[str, datetime] = {}
+    totals = {"articles": 0, "chunks": 0}
+    try:
+        # on failure the uploader has already saved every article whose batch completed;
+        # the cutoff is left alone so the next run retries the rest
+        articles = iter_articles_multi(URL, LOCALES, cache=cache)
+        jobs = iter_target_jobs(articles, state, fetched, targets, max_updated)
+        upload_chunked_articles(count_chunks(iter_convert_and_chunk(jobs, workers), totals), state_store=store)
+    finally:
+        if cache is not None:
+            cache.save()
+        for locale in LOCALES:
+            print(f"[run] locale={locale} fetched={fetched.get(locale, 0)} target={targets.get(locale, 0)}")
+        print(f"[run] chunked_articles={totals['articles']} total_chunks={totals['chunks']}")
+
+    if not fetched:
+        print("[run] no articles fetched")
+        return
 
-    if last_updated:
-        last_dt = parse_ts(last_updated)
-        target = [a for a in articles if "updated_at" in a and parse_ts(a["updated_at"]) > last_dt]
-    else:
-        target = articles  # first run
+    cutoffs = {locale: ts.isoformat().replace("+00:00", "Z") for locale, ts in max_updated.items()}
 
-    print(f"[run] fetched={len(articles)} target={len(target)}")
+    def advance_cutoffs(state: Dict) -> None:
+        for locale, max_ts in cutoffs.items():
+            set_last_updated(state, locale, max_ts)
 
-    total_chunks = 0
-    for a in target:
-        md_path = convert_article_to_md(a, out_dir=OUT_DIR, allow_overwrite=True)
-        total_chunks += write_chunks_for_md(Path(md_path), chunk_dir=CHUNK_DIR)
+    store.update(advance_cutoffs)
+    for locale, max_ts in cutoffs.items():
+        print(f"[run] locale={locale} last_updated={max_ts}")
 
-    print(f"[run] chunked_articles={len(target)} total_chunks={total_chunks}")
+def main():
+    from services.profiling import add_profile_args, profiled
 
-    upload_delta_articles(chunk_root=CHUNK_DIR, state_path=STATE_PATH)
+    parser = argparse.ArgumentParser(description="Crawl, convert, chunk and upload changed Help Center articles.")
+    add_profile_args(parser)
+    args = parser.parse_args()
 
-    max_updated = max(parse_ts(a["updated_at"]) for a in articles if "updated_at" in a).isoformat().replace("+00:00", "Z")
-    state = load_state(STATE_PATH)
-    state["last_updated"] = max_updated
-    save_state(state, STATE_PATH)
-    if GCS_BUCKET:
-        save_state_to_gcs(GCS_BUCKET, GCS_BLOB, STATE_PATH)
-    print(f"[run] last_updated={max_updated}")
+    with profiled(args, sys.modules[__name__], WORKERS) as workers:
+        run_once(workers=workers)
 
 if __name__ == "__main__":
-    run_once()
-
-
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from services.chunk import Chunk, chunk_markdown
+from services.search_index import Bm25Index
+
+MD_DIR = "data/md"
+INDEX_DIR = "data/index"
+
+
+def chunk_md_file(md_path: Path, md_root: Optional[Path] = None, **chunk_kwargs) -> Tuple[str, List[Chunk]]:
+    """
+    (article_key, chunks) for a converted article; id falls back to the file name prefix.
+    Files in a <locale>/ directory under `md_root` (where main.py writes non-default
+    locales) are keyed "<locale>/<article_id>", as in the upload state, and their chunk ids
+    get the same prefix, so a translation does not replace the default-locale article.
+    """
+    chunks = chunk_markdown(md_path.read_text(encoding="utf-8"), **chunk_kwargs)
+    article_id = chunks[0].article_id if chunks and chunks[0].article_id else md_path.stem.split("-")[0]
+    locale = md_locale(md_path, md_root)
+    if locale:
+        article_id = f"{locale}/{article_id}"
+        chunks = [replace(ch, chunk_id=f"{locale}/{ch.chunk_id}") for ch in chunks]
+    return article_id, chunks
+
+
+def md_locale(md_path: Path, md_root: Optional[Path]) -> Optional[str]:
+    """The <locale>/ directory of a file under `md_root`, None for top-level (default-locale) files."""
+    if md_root is None:
+        return None
+    try:
+        parts = md_path.resolve().relative_to(md_root.resolve()).parts
+    except ValueError:
+        return None  # not under md_root
+    return parts[0] if len(parts) > 1 else None
+
+
+def chunk_kwargs_from_args(args) -> Dict:
+    return {
+        "target_chars": args.target_chars,
+        "max_chars": args.max_chars,
+        "overlap_chars": args.overlap_chars,
+        "include_toc_chunk": not args.no_toc,
+    }
+
+
+def add_chunking_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--target-chars", type=int, default=2200)
+    parser.add_argument("--max-chars", type=int, default=4200)
+    parser.add_argument("--overlap-chars", type=int, default=200)
+    parser.add_argument("--no-toc", action="store_true", help="do not emit separate TOC chunks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local BM25 search over chunked articles.")
+    parser.add_argument("--index", default=INDEX_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_build = sub.add_parser("build", help="build the index from a directory of converted .md files")
+    p_build.add_argument("--md-dir", default=MD_DIR)
+    add_chunking_args(p_build)
+
+    p_add = sub.add_parser("add", help="add or replace articles from .md files")
+    p_add.add_argument("files", nargs="+")
+    p_add.add_argument("--md-dir", default=MD_DIR, help="files in its <locale>/ directories are keyed <locale>/<id>")
+    add_chunking_args(p_add)
+
+    p_rm = sub.add_parser("remove", help="remove articles by id")
+    p_rm.add_argument("article_ids", nargs="+")
+
+    p_q = sub.add_parser("query", help="search the index")
+    p_q.add_argument("text")
+    p_q.add_argument("-k", type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        idx = Bm25Index()
+        md_root = Path(args.md_dir)
+        for fp in sorted(md_root.rglob("*.md")):
+            article_id, chunks = chunk_md_file(fp, md_root, **chunk_kwargs_from_args(args))
+            idx.add_article(article_id, chunks)
+        idx.save(args.index)
+        print(f"[index] built docs={len(idx)} terms={len(idx.terms)} bytes={idx.nbytes()} in {time.perf_counter() - t0:.2f}s -> {args.index}")
+        return
+
+    idx = Bm25Index.load(args.index)
+
+    if args.cmd == "add":
+        for f in args.files:
+            article_id, chunks = chunk_md_file(Path(f), Path(args.md_dir), **chunk_kwargs_from_args(args))
+            print(f"[index] {article_id} chunks={idx.add_article(article_id, chunks)}")
+        idx.save(args.index)
+    elif args.cmd == "remove":
+        for article_id in args.article_ids:
+            print(f"[index] {article_id} removed={idx.remove_article(article_id)}")
+        idx.save(args.index)
+    elif args.cmd == "query":
+        t0 = time.perf_counter()
+        hits = idx.search(args.text, k=args.k)
+        print(f"[query] {len(hits)} hits in {(time.perf_counter() - t0) * 1000:.2f}ms")
+        for h in hits:
+            print(f"  {h.score:7.3f}  {h.chunk_id:<28} {h.label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import os
+import signal
+import threading
+
+from services.webhook import EventCoalescer, make_server, simulate
+from main import LOCALE, LOCALES, make_http_cache, make_state_store
+
+# Help Center webhook signing secret; requests are not verified when unset
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+
+
+def run_service(args) -> None:
+    if args.dry_run:
+        def process(locale, ids):
+            print(f"[serve] dry-run ingest locale={locale} ids={ids}")
+    else:
+        from ingest_one import ingest
+
+        # the daily run's state (GCS when configured): workers merge their results into it
+        # as saved at commit time. Conversion runs in the worker thread (no per-batch
+        # process pool from threads).
+        state_store = make_state_store()
+        # one HTTP cache shared by all workers (it is thread-safe); its index is saved
+        # after every batch so a killed service keeps what it fetched
+        cache = make_http_cache()
+
+        def process(locale, ids):
+            try:
+                ingest(ids, locale=locale, workers=1, state_store=state_store, cache=cache)
+            finally:
+                if cache is not None:
+                    cache.save()
+
+    coalescer = EventCoalescer(
+        process,
+        debounce_sec=args.debounce,
+        max_delay_sec=args.max_delay,
+        max_workers=args.workers,
+    )
+    # translation events for locales this deployment does not ingest are dropped, so they
+    # cannot overwrite the default locale's entries
+    server = make_server(
+        coalescer,
+        host=args.host,
+        port=args.port,
+        default_locale=args.locale,
+        locales=LOCALES,
+        secret=WEBHOOK_SECRET,
+    )
+
+    def shutdown(*_):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"[serve] listening on http://{args.host}:{args.port}/events debounce={args.debounce}s workers={args.workers}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        print("[serve] shutting down, flushing pending articles")
+        coalescer.close(flush=True)
+        print(f"[serve] stats {coalescer.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuous ingestion from Help Center article webhooks.")
+    sub = parser.add_subparsers(dest="cmd")
+
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--locale", default=LOCALE, help="locale for events that do not carry one")
+    parser.add_argument("--debounce", type=float, default=30.0, help="seconds of quiet before an article is ingested")
+    parser.add_argument("--max-delay", type=float, default=300.0, help="upper bound on how long edits are coalesced")
+    parser.add_argument("--workers", type=int, default=2, help="concurrent ingest batches")
+    parser.add_argument("--dry-run", action="store_true", help="log coalesced batches instead of ingesting")
+
+    p_sim = sub.add_parser("simulate", help="post bursts of article.updated events to a running service")
+    p_sim.add_argument("article_ids", nargs="+")
+    p_sim.add_argument("--url", default="http://127.0.0.1:8080/events")
+    p_sim.add_argument("--edits", type=int, default=5, help="events per article")
+    p_sim.add_argument("--interval", type=float, default=0.5, help="seconds between bursts")
+
+    args = parser.parse_args()
+
+    if args.cmd != "simulate" and args.locale not in LOCALES:
+        parser.error(f"locale {args.locale!r} is not in HC_LOCALES ({','.join(LOCALES)})")
+
+    if args.cmd == "simulate":
+        simulate(args.url, args.article_ids, locale=args.locale, edits_per_article=args.edits, edit_interval_sec=args.interval)
+    else:
+        run_service(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import requests
+
+from services.uploader import get_file_batch, make_openai_session
+
+_TERMINAL = ("completed", "failed", "cancelled")
+
+
+@dataclass
+class TrackedBatch:
+    vector_store_id: str
+    batch_id: str
+    key: str  # caller's label for the batch (article id)
+    submitted_at: float
+    next_poll_at: float
+    polls: int = 0
+    errors: int = 0
+    status: str = "in_progress"
+    file_counts: Dict = field(default_factory=dict)
+    result: Optional[Dict] = None
+    finished_at: Optional[float] = None
+    # first observed progress sample, used to estimate the processing rate
+    _first_done: Optional[int] = None
+    _first_done_at: Optional[float] = None
+
+    @property
+    def latency_s(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+
+class BatchTracker:
+    """
+    Poll all outstanding vector store file batches from a single background loop.
+
+    Each batch gets its own next-poll time: fast right after submission, backing off as it
+    ages, and pulled forward when `file_counts` progress predicts completion earlier.
+    Callers keep uploading while batches are processed and call `wait_all()` at the end.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: float = 1.0,
+        max_interval: float = 15.0,
+        backoff_per_sec: float = 0.1,
+        max_wait_sec: int = 900,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_per_sec = backoff_per_sec
+        self.max_wait_sec = max_wait_sec
+
+        self._batches: List[TrackedBatch] = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "BatchTracker":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="batch-tracker", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def add(self, vector_store_id: str, batch_id: str, key: str = "") -> None:
+        now = time.time()
+        b = TrackedBatch(vector_store_id, batch_id, key or batch_id, submitted_at=now, next_poll_at=now + self.min_interval)
+        with self._cond:
+            self._batches.append(b)
+            self._cond.notify_all()
+        self.start()
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(1 for b in self._batches if b.finished_at is None)
+
+    def wait_all(self) -> List[TrackedBatch]:
+        """Block until every added batch reached a terminal status (or timed out)."""
+        with self._cond:
+            while any(b.finished_at is None for b in self._batches):
+                self._cond.wait()
+            return list(self._batches)
+
+    def report(self) -> None:
+        with self._cond:
+            done = [b for b in self._batches if b.latency_s is not None]
+        for b in done:
+            print(f"[batch {b.batch_id}] key={b.key} status={b.status} latency={b.latency_s:.1f}s polls={b.polls} errors={b.errors}")
+        if done:
+            lat = sorted(b.latency_s for b in done)
+            print(
+                f"[batch] n={len(lat)} latency_p50={statistics.median(lat):.1f}s "
+                f"latency_max={lat[-1]:.1f}s polls={sum(b.polls for b in done)}"
+            )
+
+    def _next_interval(self, b: TrackedBatch, now: float) -> float:
+        age = now - b.submitted_at
+        interval = min(self.max_interval, self.min_interval + age * self.backoff_per_sec)
+
+        total = b.file_counts.get("total") or 0
+        done = sum(b.file_counts.get(k) or 0 for k in ("completed", "failed", "cancelled"))
+        if total and b._first_done is None:
+            b._first_done, b._first_done_at = done, now
+        elif total and done > b._first_done:
+            rate = (done - b._first_done) / (now - b._first_done_at)
+            eta = (total - done) / rate
+            interval = min(interval, max(self.min_interval, eta))
+        return interval
+
+    def _poll(self, session: requests.Session, b: TrackedBatch) -> None:
+        now = time.time()
+        if now - b.submitted_at > self.max_wait_sec:
+            b.status = "timeout"
+            b.result = {"id": b.batch_id, "status": "timeout"}
+            b.finished_at = now
+            print(f"[batch {b.batch_id}] timeout after {self.max_wait_sec}s")
+            return
+
+        try:
+            data = get_file_batch(b.vector_store_id, b.batch_id, session=session)
+        except requests.exceptions.RequestException as e:
+            b.errors += 1
+            delay = min(self.max_interval, self.min_interval * 1.5 ** b.errors)
+            print(f"[batch {b.batch_id}] request error: {e} -> retry in {delay:.1f}s")
+            b.next_poll_at = time.time() + delay
+            return
+
+        now = time.time()
+        b.polls += 1
+        b.status = data.get("status") or b.status
+        b.file_counts = data.get("file_counts") or {}
+        if b.status in _TERMINAL:
+            b.result = data
+            b.finished_at = now
+            print(f"[batch {b.batch_id}] status={b.status} counts={b.file_counts} latency={b.latency_s:.1f}s")
+            return
+        b.next_poll_at = now + self._next_interval(b, now)
+
+    def _run(self) -> None:
+        session = make_openai_session()
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    pending = [b for b in self._batches if b.finished_at is None]
+                    now = time.time()
+                    due = [b for b in pending if b.next_poll_at <= now]
+                    if due:
+                        break
+                    timeout = min((b.next_poll_at for b in pending), default=now + 60) - now
+                    self._cond.wait(timeout=max(timeout, 0.05))
+
+            for b in due:
+                try:
+                    self._poll(session, b)
+                except Exception as e:  # a bad response must not kill the loop wait_all() depends on
+                    b.status = "failed"
+                    b.result = {"id": b.batch_id, "status": "failed", "error": repr(e)}
+                    b.finished_at = time.time()
+                    print(f"[batch {b.batch_id}] poll failed: {e!r}")
+
+            with self._cond:
+                self._cond.notify_all()
@@ -1,6 +1,8 @@
 import json
 import re
+import shutil
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 
@@ -365,3 +367,29 @@ def chunk_markdown(
         flush_section(section_lines, heading_path, is_toc=False, section_index=section_index)
 
     return chunks
+
+
+def write_chunks_for_md(md_path: Path, chunk_dir: str = "data/chunks") -> int:
+    md_text = md_path.read_text(encoding="utf-8")
+    chunks = chunk_markdown(md_text)
+
+    article_id = chunks[0].article_id if chunks and chunks[0].article_id else md_path.stem.split("-")[0]
+
+    return write_chunks(chunks, article_id, chunk_dir)
+
+
+def write_chunks(chunks: List[Chunk], article_id: str, chunk_dir: str = "data/chunks") -> int:
+    """
+    Write chunks as <chunk_dir>/<article_id>/<article_id>_NNNN.md, replacing the dir.
+    """
+    out_root = Path(chunk_dir) / str(article_id)
+
+    if out_root.exists():
+        shutil.rmtree(out_root)
+    out_root.mkdir(parents=True, exist_ok=True)
+
+    for i, ch in enumerate(chunks, 1):
+        out_file = out_root / f"{article_id}_{i:04d}.md"
+        out_file.write_text(ch.text, encoding="utf-8")
+
+    return len(chunks)
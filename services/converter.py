@@ -1,11 +1,15 @@
 import re
 from pathlib import Path
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+from typing import TYPE_CHECKING
 import unicodedata
 import json
 
-def clean_soup(soup: BeautifulSoup) -> BeautifulSoup:
+# bs4/html5lib/markdownify are imported in html_to_markdown: they are the heaviest
+# imports in the project and runs with nothing to convert never need them.
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+def clean_soup(soup: "BeautifulSoup") -> "BeautifulSoup":
 
     for tag in soup(["script", "style"]):
         tag.decompose()
@@ -26,6 +30,9 @@ def clean_soup(soup: BeautifulSoup) -> BeautifulSoup:
     return soup
 
 def html_to_markdown(html: str) -> str:
+    from bs4 import BeautifulSoup
+    from markdownify import markdownify as md
+
     soup = BeautifulSoup(html, "html5lib")
     soup = clean_soup(soup)
 
@@ -48,16 +55,14 @@ def safe_slug(s: str) -> str:
     s = re.sub(r"[-\s]+", "-", s)
     return s or "article"
 
-def convert_article_to_md(article: dict, out_dir: str = "data/md", allow_overwrite: bool = False) -> Path:
+def article_md_filename(article: dict) -> str:
+    article_id = article.get("id")
+    title = article.get("title") or f"article-{article_id}"
+    return f"{article_id}-{safe_slug(title)}.md" if article_id else f"{safe_slug(title)}.md"
+
+def article_to_markdown(article: dict) -> str:
     """
-    Docstring for convert_article_to_md
-    
-    :param article: Article data
-    :type article: dict
-    :param out_dir: Output directory
-    :type out_dir: str
-    :return: Path to the generated markdown file
-    :rtype: Path
+    Render an article (front matter + title + body) to Markdown in memory.
     """
     article_id = article.get("id")
     title = article.get("title") or f"article-{article_id}"
@@ -79,7 +84,7 @@ def convert_article_to_md(article: dict, out_dir: str = "data/md", allow_overwri
         "---\n\n"
     )
 
-    content = "\n".join([
+    return "\n".join([
         front.rstrip(),
         f"# {title}",
         "",
@@ -89,15 +94,24 @@ def convert_article_to_md(article: dict, out_dir: str = "data/md", allow_overwri
         ""
     ])
 
+def convert_article_to_md(article: dict, out_dir: str = "data/md", allow_overwrite: bool = False) -> Path:
+    """
+    Docstring for convert_article_to_md
+    
+    :param article: Article data
+    :type article: dict
+    :param out_dir: Output directory
+    :type out_dir: str
+    :return: Path to the generated markdown file
+    :rtype: Path
+    """
     out_path = Path(out_dir)
     out_path.mkdir(parents=True, exist_ok=True)
 
-    fname = f"{article_id}-{safe_slug(title)}.md" if article_id else f"{safe_slug(title)}.md"
-
-    md_path = out_path / fname
+    md_path = out_path / article_md_filename(article)
 
     if md_path.exists() and not allow_overwrite:
         return md_path
 
-    md_path.write_text(content, encoding="utf-8")
+    md_path.write_text(article_to_markdown(article), encoding="utf-8")
     return md_path
@@ -1,6 +1,32 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
 import requests
 
-def list_articles(base_helpcenter_url: str, locale: str | None = None, limit: int = 50):
+from services.json_stream import iter_array_items
+
+if TYPE_CHECKING:
+    from services.http_cache import HttpCache
+
+ZENDESK_API_URL = "https://optisignshelp.zendesk.com"
+
+# Article fields read by the convert/chunk pipeline; iter_articles drops the rest by default
+ARTICLE_FIELDS = ("id", "title", "html_url", "url", "updated_at", "label_names", "locale", "body")
+
+# bytes per read when streaming a page
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def _get_json(session: requests.Session, url: str, cache: Optional["HttpCache"] = None, params: Optional[Dict] = None, timeout=30):
+    """GET + parse JSON, through the conditional-request cache when one is given."""
+    if cache is not None:
+        return cache.get_json(session, url, params=params, timeout=timeout)
+    r = session.get(url, params=params, timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+def list_articles(base_helpcenter_url: str, locale: str | None = None, limit: int = 50, cache: Optional["HttpCache"] = None):
     """
     Docstring for list_articles
     
@@ -10,6 +36,8 @@ def list_articles(base_helpcenter_url: str, locale: str | None = None, limit: in
     :type locale: str | None
     :param limit: Maximum number of articles to retrieve
     :type limit: int
+    :param cache: Optional HttpCache; unchanged pages are then served from disk on a 304
+    :type cache: HttpCache | None
     """ 
     session = requests.Session()
     session.headers.update({"Accept": "application/json"})
@@ -19,17 +47,156 @@ def list_articles(base_helpcenter_url: str, locale: str | None = None, limit: in
 
     out = []
     while url and len(out) < limit:
-        r = session.get(url, timeout=30)
-        r.raise_for_status()
-        data = r.json()
+        data = _get_json(session, url, cache, timeout=30)
 
         out.extend(data.get("articles", []))
         url = data.get("next_page")  # Zendesk commonly returns absolute next_page
 
     return out #list of articles with length up to limit
 
-def fetch_article_by_id(article_id: int | str, locale: str = "en-us") -> dict:
-    url = f"https://optisignshelp.zendesk.com/api/v2/help_center/{locale}/articles/{article_id}.json"
-    r = requests.get(url, timeout=(10, 60))
-    r.raise_for_status()
-    return r.json()["article"]
\ No newline at end of file
+def _iter_page_chunks(session: requests.Session, url: str, cache: Optional["HttpCache"] = None, timeout=30) -> Iterator[bytes]:
+    """A page body as byte chunks, streamed off the socket (through the cache's file when one is given)."""
+    if cache is not None:
+        yield from cache.iter_content(session, url, timeout=timeout, chunk_size=STREAM_CHUNK_BYTES)
+        return
+    with session.get(url, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        yield from r.iter_content(chunk_size=STREAM_CHUNK_BYTES)
+
+def iter_articles(
+    base_helpcenter_url: str,
+    locale: str | None = None,
+    limit: int = 50,
+    cache: Optional["HttpCache"] = None,
+    fields: Optional[Iterable[str]] = ARTICLE_FIELDS,
+) -> Iterator[dict]:
+    """
+    Streaming counterpart of `list_articles`: pages are parsed incrementally and articles
+    are yielded one at a time, so memory stays bounded by the largest single article
+    rather than the corpus. Only `fields` are kept on each article (None keeps all).
+    Pages are requested while fewer than `limit` articles have been yielded.
+    """
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+
+    path = f"/api/v2/help_center/{locale}/articles.json" if locale else "/api/v2/help_center/articles.json"
+    url = base_helpcenter_url.rstrip("/") + path
+    keep = tuple(fields) if fields is not None else None
+
+    n = 0
+    while url and n < limit:
+        meta: Dict = {}
+        for article in iter_array_items(_iter_page_chunks(session, url, cache), "articles", meta):
+            if keep is not None:
+                article = {k: article[k] for k in keep if k in article}
+            n += 1
+            yield article
+        url = meta.get("next_page")
+
+def iter_articles_multi(
+    base_helpcenter_url: str,
+    locales: List[str],
+    limit: int = 50,
+    cache: Optional["HttpCache"] = None,
+    fields: Optional[Iterable[str]] = ARTICLE_FIELDS,
+    buffer: int = 64,
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Stream several locales concurrently (one crawl thread per locale), yielding
+    (locale, article) as articles arrive. At most `buffer` articles wait between the
+    crawl threads and the consumer; a crawl error is re-raised in the consumer.
+    """
+    if len(locales) <= 1:
+        for loc in locales:
+            for a in iter_articles(base_helpcenter_url, loc, limit, cache, fields):
+                yield loc, a
+        return
+
+    q: "queue.Queue[Tuple[str, object]]" = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False  # consumer went away
+
+    def crawl(loc: str) -> None:
+        try:
+            for a in iter_articles(base_helpcenter_url, loc, limit, cache, fields):
+                if not put((loc, a)):
+                    return
+            put((loc, done))
+        except Exception as e:
+            put((loc, e))
+
+    for loc in locales:
+        threading.Thread(target=crawl, args=(loc,), name=f"crawl-{loc}", daemon=True).start()
+    try:
+        remaining = len(locales)
+        while remaining:
+            loc, item = q.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield loc, item
+    finally:
+        stop.set()
+
+def fetch_article_by_id(article_id: int | str, locale: str = "en-us", cache: Optional["HttpCache"] = None) -> dict:
+    url = f"{ZENDESK_API_URL}/api/v2/help_center/{locale}/articles/{article_id}.json"
+    return _get_json(requests.Session(), url, cache, timeout=(10, 60))["article"]
+
+def _show_many(session: requests.Session, ids: List[str], locale: str, cache: Optional["HttpCache"] = None) -> List[dict]:
+    url = f"{ZENDESK_API_URL}/api/v2/help_center/{locale}/articles/show_many.json"
+    try:
+        data = _get_json(session, url, cache, params={"ids": ",".join(ids)}, timeout=(10, 60))
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code != 404:
+            raise
+        # endpoint unavailable for this locale/account: fall back to one GET per id
+        return [a for a in (_fetch_if_exists(i, locale, cache) for i in ids) if a is not None]
+    return data.get("articles", [])
+
+def _fetch_if_exists(article_id: str, locale: str, cache: Optional["HttpCache"] = None) -> Optional[dict]:
+    """fetch_article_by_id, or None for a missing/deleted article (reported by the caller)."""
+    try:
+        return fetch_article_by_id(article_id, locale=locale, cache=cache)
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code != 404:
+            raise
+        return None
+
+def fetch_articles_by_ids(
+    article_ids: List[int | str],
+    locale: str = "en-us",
+    batch_size: int = 100,
+    max_workers: int = 4,
+    cache: Optional["HttpCache"] = None,
+) -> List[dict]:
+    """
+    Fetch many articles by id with the show-many endpoint, `batch_size` ids per request,
+    requests run concurrently. Returns articles in the order of `article_ids`; ids the
+    API did not return are reported and skipped.
+    """
+    ids = list(dict.fromkeys(str(i) for i in article_ids))
+    if not ids:
+        return []
+
+    session = requests.Session()
+    session.headers.update({"Accept": "application/json"})
+    batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as pool:
+        results = pool.map(lambda b: _show_many(session, b, locale, cache), batches)
+        by_id = {str(a["id"]): a for batch in results for a in batch}
+
+    missing = [i for i in ids if i not in by_id]
+    if missing:
+        print(f"[crawl] locale={locale} not found: {missing}")
+    return [by_id[i] for i in ids if i in by_id]
\ No newline at end of file
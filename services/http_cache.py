@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional
+
+import requests
+
+
+class HttpCache:
+    """
+    Persistent, size-bounded cache for GET responses, revalidated with conditional requests.
+
+    Each URL keeps its ETag / Last-Modified and the last 200 body on disk. Later GETs send
+    If-None-Match / If-Modified-Since; a 304 is answered from disk. Bodies are streamed to
+    and from disk (`iter_content`), so a large page is never held in memory whole. Least recently used
+    entries are evicted once the bodies exceed `max_bytes`. Call `save()` to persist the index.
+    """
+
+    def __init__(self, root: str = "data/http_cache", max_bytes: int = 256 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "uncacheable": 0, "evicted": 0, "bytes_saved": 0}
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, Dict]" = OrderedDict()
+        self._total = 0
+
+        index_path = self.root / "index.json"
+        if index_path.exists():
+            try:
+                entries = json.loads(index_path.read_text(encoding="utf-8"))
+            except ValueError:
+                entries = []  # corrupt index: start cold
+            for e in entries:  # stored least -> most recently used
+                if (self.root / e["file"]).exists():
+                    self._index[e["url"]] = e
+                    self._total += e["size"]
+        self._evict()  # max_bytes may have been lowered since the last run
+
+    def get(
+        self,
+        session: requests.Session,
+        url: str,
+        *,
+        params: Optional[Dict] = None,
+        timeout=30,
+    ) -> bytes:
+        """
+        GET `url` (with `params`), revalidating a cached copy if there is one. Returns the body.
+        """
+        return b"".join(self.iter_content(session, url, params=params, timeout=timeout))
+
+    def iter_content(
+        self,
+        session: requests.Session,
+        url: str,
+        *,
+        params: Optional[Dict] = None,
+        timeout=30,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        """
+        Like `get`, but the body is yielded in chunks and never held whole: a 200 is streamed
+        off the socket into its cache file and then read back from it, a 304 reads the
+        cached file the same way.
+        """
+        key = requests.Request("GET", url, params=params).prepare().url
+
+        with self._lock:
+            entry = self._index.get(key)
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with session.get(key, headers=headers, timeout=timeout, stream=True) as r:
+            if r.status_code == 304 and entry:
+                body = self._open_body(entry["file"])
+                if body is not None:
+                    with self._lock:
+                        if key in self._index:
+                            self._index.move_to_end(key)
+                        self.stats["hits"] += 1
+                        self.stats["bytes_saved"] += entry["size"]
+            else:
+                r.raise_for_status()
+                etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+                if not etag and not last_modified:
+                    with self._lock:
+                        self.stats["uncacheable"] += 1
+                    yield from r.iter_content(chunk_size=chunk_size)
+                    return
+                body = self._store(key, r.iter_content(chunk_size=chunk_size), etag, last_modified)
+                with self._lock:
+                    self.stats["misses"] += 1
+
+        if body is None:
+            # body evicted/removed behind our back: drop the entry and refetch unconditionally
+            self._drop(key)
+            yield from self.iter_content(session, url, params=params, timeout=timeout, chunk_size=chunk_size)
+            return
+        with body:
+            while chunk := body.read(chunk_size):
+                yield chunk
+
+    def get_json(self, session: requests.Session, url: str, *, params: Optional[Dict] = None, timeout=30):
+        return json.loads(self.get(session, url, params=params, timeout=timeout))
+
+    def _open_body(self, fname: str) -> Optional[BinaryIO]:
+        try:
+            return (self.root / fname).open("rb")
+        except FileNotFoundError:
+            return None
+
+    def _store(self, key: str, chunks: Iterable[bytes], etag: Optional[str], last_modified: Optional[str]) -> BinaryIO:
+        """Write the body to its cache file chunk by chunk; returns it opened for reading."""
+        fname = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".body"
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{fname}.{os.getpid()}.{threading.get_ident()}.tmp"
+        size = 0
+        try:
+            with tmp.open("wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    size += len(chunk)
+            # opened before it is published, so the caller can read it even if it is
+            # evicted or replaced right away
+            body = tmp.open("rb")
+            os.replace(tmp, self.root / fname)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old:
+                self._total -= old["size"]
+            self._index[key] = {
+                "url": key,
+                "file": fname,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": size,
+            }
+            self._total += size
+        self._evict()
+        return body
+
+    def _evict(self) -> None:
+        """Drop least recently used entries (keeping at least one) until under max_bytes."""
+        with self._lock:
+            evict = []
+            while self._total > self.max_bytes and len(self._index) > 1:
+                _, e = self._index.popitem(last=False)
+                self._total -= e["size"]
+                evict.append(e["file"])
+            self.stats["evicted"] += len(evict)
+
+        for f in evict:
+            (self.root / f).unlink(missing_ok=True)
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            e = self._index.pop(key, None)
+            if e:
+                self._total -= e["size"]
+
+    def save(self) -> None:
+        with self._lock:
+            entries = list(self._index.values())
+            stats = dict(self.stats)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # per-writer temp name: concurrent saves (threads or processes) must not share one
+        tmp = self.root / f"index.json.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_text(json.dumps(entries), encoding="utf-8")
+        os.replace(tmp, self.root / "index.json")
+        print(
+            f"[cache] hits={stats['hits']} misses={stats['misses']} uncacheable={stats['uncacheable']} "
+            f"evicted={stats['evicted']} entries={len(entries)} bytes={self._total} saved_bytes={stats['bytes_saved']}"
+        )
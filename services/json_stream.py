@@ -0,0 +1,107 @@
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\r\n"
+_NUMBER_END = ",]}" + _WS
+
+
+def _is_number(obj: Any) -> bool:
+    return isinstance(obj, (int, float)) and not isinstance(obj, bool)
+
+
+class _Buffer:
+    """Decoded text over an iterator of byte chunks; consumed text is dropped as it is read."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, min_chars: int = 1) -> bool:
+        """Append at least `min_chars` more characters (or the rest of the input). False at end of input."""
+        parts, got = [], 0
+        while got < min_chars and not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._utf8.decode(b"", final=True)
+            else:
+                text = self._utf8.decode(chunk)
+            parts.append(text)
+            got += len(text)
+        if not got:
+            return False
+        self.text = self.text[self.pos:] + "".join(parts)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input), without consuming it."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.text, self.pos)
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input until it is available."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.text, self.pos)
+                # a number cut by a chunk boundary ("2." + "5", "1e" + "3", "12" + "3") decodes
+                # to a shorter number; it is only complete when a delimiter follows it
+                if self.eof or not _is_number(obj) or (end < len(self.text) and self.text[end] in _NUMBER_END):
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # at least double the pending text before retrying, so a huge value is parsed
+            # O(log n) times rather than once per chunk
+            self.fill(max(1, len(self.text) - self.pos))
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str, meta: Dict[str, Any]) -> Iterator[Any]:
+    """
+    Incrementally parse a JSON object of the form {..., key: [item, ...], ...} from byte
+    chunks, yielding the items of `key` one at a time. Only the current item is held in
+    memory. The object's other members are stored in `meta` (complete once the generator
+    is exhausted).
+    """
+    buf = _Buffer(chunks)
+    buf.expect("{")
+    if buf.peek() == "}":
+        buf.pos += 1
+        return
+    while True:
+        name = buf.value()
+        if not isinstance(name, str):
+            raise json.JSONDecodeError("Expecting property name", buf.text, buf.pos)
+        buf.expect(":")
+        if name == key and buf.peek() == "[":
+            buf.pos += 1
+            if buf.peek() == "]":
+                buf.pos += 1
+            else:
+                while True:
+                    yield buf.value()
+                    if buf.expect(",]") == "]":
+                        break
+        else:
+            meta[name] = buf.value()
+        if buf.expect(",}") == "}":
+            return
@@ -0,0 +1,413 @@
+import argparse
+import cProfile
+import importlib
+import inspect
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Iterator, List, Tuple
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+PROFILE_DIR = "data/profile"
+
+# (stage name, module, attribute) of the functions timed per call. Stages nest (clean_soup
+# runs inside html_to_markdown); `self_s` excludes time spent in nested stages.
+STAGES = (
+    ("crawl", "services.crawler", "iter_articles"),
+    ("fetch_by_ids", "services.crawler", "fetch_articles_by_ids"),
+    ("html_to_markdown", "services.converter", "html_to_markdown"),
+    ("clean_soup", "services.converter", "clean_soup"),
+    ("chunk_markdown", "services.chunk", "chunk_markdown"),
+    ("compute_article_hash", "services.uploader", "compute_article_hash"),
+    ("compute_chunks_hash", "services.uploader", "compute_chunks_hash"),
+    ("upload_file", "services.uploader", "upload_file"),
+    ("upload_bytes", "services.uploader", "upload_bytes"),
+    ("create_file_batch", "services.uploader", "create_file_batch"),
+    ("wait_batches", "services.batch_tracker", "BatchTracker.wait_all"),
+    ("cleanup_files", "services.uploader", "cleanup_files"),
+)
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    wall_s: float = 0.0
+    self_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_alloc_mb: float = 0.0  # largest traced allocation growth during one call
+
+
+@dataclass
+class ArticleTiming:
+    key: str
+    body_kb: float
+    wall_ms: float
+    cpu_ms: float
+    chunks: int
+    first: bool = False  # first conversion also pays for the lazy bs4/markdownify imports
+
+
+class _Frame:
+    __slots__ = ("t0", "cpu0", "mem0", "mem_peak", "child_s")
+
+    def __init__(self, mem0: int):
+        self.t0 = time.perf_counter()
+        self.cpu0 = time.thread_time()
+        self.mem0 = mem0
+        self.mem_peak = mem0
+        self.child_s = 0.0
+
+
+class _StackSampler(threading.Thread):
+    """Wall-clock sampler of every thread's Python stack, aggregated as collapsed stacks."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._labels: Dict = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = Path(code.co_filename)
+            try:
+                where = path.resolve().relative_to(_ROOT).as_posix()
+            except ValueError:
+                where = path.name
+            label = f"{where}:{getattr(code, 'co_qualname', code.co_name)}".replace(";", ":").replace(" ", "_")
+            self._labels[code] = label
+        return label
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)).replace(" ", "_"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Profile a pipeline run: cProfile over the calling thread, tracemalloc, per-stage
+    wall/CPU/allocation timers (the functions in STAGES are wrapped for the duration),
+    per-article convert timings and a sampling profiler for flamegraphs.
+
+        with Profiler("data/profile") as prof:
+            prof.track_articles(main_module, "_convert_and_chunk")
+            run_once(workers=1)
+
+    Conversion must run in-process (workers=1) for its stages to be seen. On exit, a
+    summary is printed and <out_dir>/ gets report.json, stacks.collapsed
+    (`flamegraph.pl stacks.collapsed > flame.svg`, or load in speedscope) and, with
+    `deterministic`, profile.pstats and profile.txt.
+
+    cProfile (`deterministic`) and tracemalloc (`allocations`) each slow pure-Python
+    conversion down ~3x; with both off only the stage timers and the sampler run, and
+    stage times are close to an unprofiled run.
+    """
+
+    def __init__(
+        self,
+        out_dir: str = PROFILE_DIR,
+        *,
+        deterministic: bool = True,
+        allocations: bool = True,
+        sample_interval: float = 0.005,
+        top: int = 15,
+    ):
+        self.out_dir = Path(out_dir)
+        self.deterministic = deterministic
+        self.allocations = allocations
+        self.sample_interval = sample_interval
+        self.top = top
+
+        self.stages: Dict[str, StageStats] = {}
+        self.articles: List[ArticleTiming] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patched: List[Tuple[object, str, object]] = []
+        self._cprofile = cProfile.Profile()
+        self._sampler = _StackSampler(sample_interval)
+        self._t0 = 0.0
+        self.wall_s = 0.0
+        self.peak_traced = 0
+
+    # --- instrumentation -------------------------------------------------------------
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self) -> _Frame:
+        stack = self._stack()
+        cur = 0
+        if self.allocations:
+            cur, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+            # the peak counter is process wide; with overlapping stages in other threads this
+            # attributes their allocations too
+            tracemalloc.reset_peak()
+        frame = _Frame(cur)
+        stack.append(frame)
+        return frame
+
+    def _exit(self, name: str, frame: _Frame) -> None:
+        wall = time.perf_counter() - frame.t0
+        cpu = time.thread_time() - frame.cpu0
+        if self.allocations:
+            frame.mem_peak = max(frame.mem_peak, tracemalloc.get_traced_memory()[1])
+        stack = self._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_s += wall
+            stack[-1].mem_peak = max(stack[-1].mem_peak, frame.mem_peak)
+        with self._lock:
+            st = self.stages.setdefault(name, StageStats())
+            st.calls += 1
+            st.wall_s += wall
+            st.self_s += wall - frame.child_s
+            st.cpu_s += cpu
+            st.peak_alloc_mb = max(st.peak_alloc_mb, (frame.mem_peak - frame.mem0) / 1e6)
+
+    def _timed_iter(self, name: str, it):
+        """Time each step of a generator (e.g. a streaming crawl) as the stage."""
+        while True:
+            frame = self._enter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._exit(name, frame)
+            yield item
+
+    def _wrap(self, name: str, fn: Callable) -> Callable:
+        if inspect.isgeneratorfunction(fn):
+            def wrapper(*args, **kwargs):
+                return self._timed_iter(name, fn(*args, **kwargs))
+        else:
+            def wrapper(*args, **kwargs):
+                frame = self._enter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._exit(name, frame)
+
+        wrapper.__wrapped__ = fn
+        wrapper.__name__ = getattr(fn, "__name__", name)
+        wrapper.__qualname__ = getattr(fn, "__qualname__", name)
+        return wrapper
+
+    def _patch(self, owner: object, attr: str, new: object) -> None:
+        self._patched.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, new)
+
+    def _patch_everywhere(self, orig: Callable, new: Callable) -> None:
+        """Replace `orig` in every project module that holds it (covers `from x import f`)."""
+        for mod in list(sys.modules.values()):
+            f = getattr(mod, "__file__", None)
+            if not f or not Path(f).resolve().is_relative_to(_ROOT):
+                continue
+            for name, val in list(vars(mod).items()):
+                if val is orig:
+                    self._patch(mod, name, new)
+
+    def _install_stages(self) -> None:
+        for name, module, attr in STAGES:
+            mod = importlib.import_module(module)
+            if "." in attr:
+                cls_name, meth = attr.split(".", 1)
+                cls = getattr(mod, cls_name)
+                self._patch(cls, meth, self._wrap(name, getattr(cls, meth)))
+            else:
+                orig = getattr(mod, attr)
+                self._patch_everywhere(orig, self._wrap(name, orig))
+
+    def track_articles(self, module: ModuleType, attr: str = "_convert_and_chunk") -> None:
+        """
+        Time every call of the per-article convert job `module.attr(job) -> (key, chunks)`,
+        job[0] being the article dict, to rank articles by convert time vs body size.
+        """
+        fn = getattr(module, attr)
+
+        def timed(job):
+            article = job[0]
+            t0, cpu0 = time.perf_counter(), time.thread_time()
+            key, chunks = fn(job)
+            timing = ArticleTiming(
+                key=str(key),
+                body_kb=round(len(article.get("body") or "") / 1024, 1),
+                wall_ms=round((time.perf_counter() - t0) * 1000, 2),
+                cpu_ms=round((time.thread_time() - cpu0) * 1000, 2),
+                chunks=len(chunks),
+            )
+            with self._lock:
+                timing.first = not self.articles
+                self.articles.append(timing)
+            return key, chunks
+
+        self._patch(module, attr, timed)
+
+    # --- lifecycle -------------------------------------------------------------------
+
+    def __enter__(self) -> "Profiler":
+        if self.allocations:
+            tracemalloc.start()
+        self._install_stages()
+        self._sampler.start()
+        self._t0 = time.perf_counter()
+        if self.deterministic:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.deterministic:
+            self._cprofile.disable()
+        self.wall_s = time.perf_counter() - self._t0
+        self._sampler.stop()
+        for owner, attr, orig in reversed(self._patched):
+            setattr(owner, attr, orig)
+        self._patched.clear()
+        if self.allocations:
+            _, self.peak_traced = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.write()
+
+    # --- reporting -------------------------------------------------------------------
+
+    def slowest_articles(self) -> List[ArticleTiming]:
+        return sorted(self.articles, key=lambda a: a.wall_ms, reverse=True)[: self.top]
+
+    def size_buckets(self) -> List[Dict]:
+        """Convert time by body size quartile, to tell size-driven slowness from outliers."""
+        by_size = sorted(self.articles, key=lambda a: a.body_kb)
+        n = len(by_size)
+        out = []
+        for q in range(4):
+            part = by_size[q * n // 4:(q + 1) * n // 4]
+            if not part:
+                continue
+            kb = sum(a.body_kb for a in part)
+            ms = sum(a.wall_ms for a in part)
+            out.append({
+                "quartile": q + 1,
+                "articles": len(part),
+                "body_kb_max": part[-1].body_kb,
+                "mean_ms": round(ms / len(part), 2),
+                "ms_per_kb": round(ms / kb, 3) if kb else 0.0,
+            })
+        return out
+
+    def write(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        files = ["report.json", "stacks.collapsed"]
+        if self.deterministic:
+            self._cprofile.dump_stats(str(self.out_dir / "profile.pstats"))
+            buf = io.StringIO()
+            pstats.Stats(self._cprofile, stream=buf).sort_stats("cumulative").print_stats(40)
+            (self.out_dir / "profile.txt").write_text(buf.getvalue(), encoding="utf-8")
+            files += ["profile.pstats", "profile.txt"]
+
+        lines = [f"{stack} {n}" for stack, n in sorted(self._sampler.counts.items())]
+        (self.out_dir / "stacks.collapsed").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        stages = {k: asdict(v) for k, v in sorted(self.stages.items(), key=lambda kv: -kv[1].wall_s)}
+        for st in stages.values():
+            for k in ("wall_s", "self_s", "cpu_s", "peak_alloc_mb"):
+                st[k] = round(st[k], 4)
+        report = {
+            "wall_s": round(self.wall_s, 3),
+            "peak_traced_mb": round(self.peak_traced / 1e6, 2) if self.allocations else None,
+            "files": files,
+            "samples": self._sampler.samples,
+            "sample_interval_s": self.sample_interval,
+            "stages": stages,
+            "articles": len(self.articles),
+            "slowest_articles": [asdict(a) for a in self.slowest_articles()],
+            "by_body_size": self.size_buckets(),
+        }
+        (self.out_dir / "report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+        self.print_summary(report)
+
+    def print_summary(self, report: Dict) -> None:
+        peak = f"{report['peak_traced_mb']}MB" if self.allocations else "off"
+        print(f"[profile] wall={report['wall_s']}s peak_traced={peak} samples={report['samples']}")
+        print(f"[profile] {'stage':<22}{'calls':>7}{'wall_s':>10}{'self_s':>10}{'cpu_s':>10}{'peak_mb':>10}")
+        for name, st in report["stages"].items():
+            peak_mb = f"{st['peak_alloc_mb']:.2f}" if self.allocations else "-"
+            print(
+                f"[profile] {name:<22}{st['calls']:>7}{st['wall_s']:>10.3f}{st['self_s']:>10.3f}"
+                f"{st['cpu_s']:>10.3f}{peak_mb:>10}"
+            )
+        if report["slowest_articles"]:
+            print(f"[profile] slowest of {report['articles']} articles (convert + chunk):")
+            for a in report["slowest_articles"]:
+                per_kb = a["wall_ms"] / a["body_kb"] if a["body_kb"] else 0.0
+                note = " (first: includes lazy imports)" if a["first"] else ""
+                print(f"[profile]   {a['key']:<24} body={a['body_kb']:>8.1f}KB {a['wall_ms']:>9.1f}ms ({per_kb:.2f}ms/KB) chunks={a['chunks']}{note}")
+            for b in report["by_body_size"]:
+                print(f"[profile]   size q{b['quartile']} <= {b['body_kb_max']}KB mean={b['mean_ms']}ms {b['ms_per_kb']}ms/KB")
+        print(f"[profile] wrote {self.out_dir}/ {' '.join(report['files'])}")
+
+
+def add_profile_args(parser: argparse.ArgumentParser) -> None:
+    """`--profile`, `--profile-mode` and `--profile-dir`, shared by the pipeline entry points."""
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the run: per-stage timings and flamegraph stacks (see --profile-mode)",
+    )
+    parser.add_argument(
+        "--profile-mode",
+        choices=("full", "sample"),
+        default="full",
+        help="full adds cProfile and tracemalloc (~3x slower each); sample runs at near-native speed",
+    )
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="where --profile writes its reports")
+
+
+@contextmanager
+def profiled(args: argparse.Namespace, module: ModuleType, workers: int) -> Iterator[int]:
+    """
+    Run the body under a Profiler when `args.profile` is set (see `add_profile_args`),
+    tracking `module`'s per-article convert job. Yields the worker count to run with:
+    `workers`, or 1 when profiling.
+    """
+    if not args.profile:
+        yield workers
+        return
+
+    # convert in-process so its stages and per-article timings are observed
+    full = args.profile_mode == "full"
+    with Profiler(args.profile_dir, deterministic=full, allocations=full) as prof:
+        prof.track_articles(module)
+        yield 1
@@ -0,0 +1,245 @@
+import heapq
+import json
+import math
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from services.chunk import Chunk
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i if in is it of on or that the this to was what when where which with you your".split()
+)
+
+
+@dataclass
+class Hit:
+    chunk_id: str
+    article_id: str
+    label: str  # "Title > Section"
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class Bm25Index:
+    """
+    BM25 inverted index over chunks, for offline retrieval experiments.
+
+    Postings are parallel `array('I')`s of doc numbers and term frequencies per term.
+    Documents are chunks keyed by `chunk_id`; `add_article` replaces all chunks of an
+    article and `remove_article` tombstones them (reclaimed by `compact`).
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.terms: Dict[str, int] = {}
+        self.df = array("I")
+        self.post_docs: List[array] = []
+        self.post_tfs: List[array] = []
+
+        self.doc_chunk_ids: List[str] = []
+        self.doc_articles: List[str] = []
+        self.doc_labels: List[str] = []  # "Title > Section", for display
+        self.doc_len = array("I")
+        self.doc_terms: List[array] = []  # unique term ids per doc, to keep df exact on removal
+        self.deleted = bytearray()
+
+        self.article_docs: Dict[str, List[int]] = {}
+        self.live_docs = 0
+        self.total_len = 0
+
+    def __len__(self) -> int:
+        return self.live_docs
+
+    def add_article(self, article_id: str, chunks: Iterable[Chunk]) -> int:
+        """Index an article's chunks, replacing any previously indexed version. Returns chunk count."""
+        self.remove_article(article_id)
+        n = 0
+        for ch in chunks:
+            label = f"{ch.title} > {ch.heading_path}" if ch.heading_path else ch.title
+            self._add_doc(ch.chunk_id, article_id, label, ch.text)
+            n += 1
+        return n
+
+    def _add_doc(self, chunk_id: str, article_id: str, label: str, text: str) -> None:
+        doc = len(self.doc_chunk_ids)
+        counts: Dict[int, int] = {}
+        tokens = tokenize(text)
+        for tok in tokens:
+            tid = self.terms.get(tok)
+            if tid is None:
+                tid = len(self.post_docs)
+                self.terms[tok] = tid
+                self.df.append(0)
+                self.post_docs.append(array("I"))
+                self.post_tfs.append(array("I"))
+            counts[tid] = counts.get(tid, 0) + 1
+
+        for tid, tf in counts.items():
+            self.post_docs[tid].append(doc)
+            self.post_tfs[tid].append(tf)
+            self.df[tid] += 1
+
+        self.doc_chunk_ids.append(chunk_id)
+        self.doc_articles.append(article_id)
+        self.doc_labels.append(label)
+        self.doc_len.append(len(tokens))
+        self.doc_terms.append(array("I", counts.keys()))
+        self.deleted.append(0)
+        self.article_docs.setdefault(article_id, []).append(doc)
+        self.live_docs += 1
+        self.total_len += len(tokens)
+
+    def remove_article(self, article_id: str) -> int:
+        docs = self.article_docs.pop(article_id, [])
+        for doc in docs:
+            self.deleted[doc] = 1
+            for tid in self.doc_terms[doc]:
+                self.df[tid] -= 1
+            self.doc_terms[doc] = array("I")
+            self.live_docs -= 1
+            self.total_len -= self.doc_len[doc]
+        # keep tombstones from dominating the postings
+        if len(self.deleted) > 64 and len(self.deleted) > 2 * self.live_docs:
+            self.compact()
+        return len(docs)
+
+    def compact(self) -> None:
+        """Drop tombstoned docs from all postings and renumber the remaining ones."""
+        remap = array("i", [-1]) * len(self.deleted)
+        new = 0
+        for doc, dead in enumerate(self.deleted):
+            if not dead:
+                remap[doc] = new
+                new += 1
+
+        for tid in range(len(self.post_docs)):
+            docs, tfs = self.post_docs[tid], self.post_tfs[tid]
+            nd, nt = array("I"), array("I")
+            for d, tf in zip(docs, tfs):
+                m = remap[d]
+                if m >= 0:
+                    nd.append(m)
+                    nt.append(tf)
+            self.post_docs[tid], self.post_tfs[tid] = nd, nt
+
+        keep = [doc for doc, dead in enumerate(self.deleted) if not dead]
+        self.doc_chunk_ids = [self.doc_chunk_ids[d] for d in keep]
+        self.doc_articles = [self.doc_articles[d] for d in keep]
+        self.doc_labels = [self.doc_labels[d] for d in keep]
+        self.doc_len = array("I", (self.doc_len[d] for d in keep))
+        self.doc_terms = [self.doc_terms[d] for d in keep]
+        self.deleted = bytearray(len(keep))
+        self.article_docs = {}
+        for doc, article_id in enumerate(self.doc_articles):
+            self.article_docs.setdefault(article_id, []).append(doc)
+
+    def search(self, query: str, k: int = 10) -> List[Hit]:
+        """Top-k chunks for the query, best first."""
+        if not self.live_docs:
+            return []
+        avgdl = self.total_len / self.live_docs
+        k1, b = self.k1, self.b
+        scores: Dict[int, float] = {}
+
+        for tok in set(tokenize(query)):
+            tid = self.terms.get(tok)
+            if tid is None or not self.df[tid]:
+                continue
+            df = self.df[tid]
+            idf = math.log(1 + (self.live_docs - df + 0.5) / (df + 0.5))
+            doc_len, deleted = self.doc_len, self.deleted
+            for doc, tf in zip(self.post_docs[tid], self.post_tfs[tid]):
+                if deleted[doc]:
+                    continue
+                norm = tf + k1 * (1 - b + b * doc_len[doc] / avgdl)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / norm
+
+        top = heapq.nlargest(k, scores.items(), key=lambda x: x[1])
+        return [
+            Hit(self.doc_chunk_ids[doc], self.doc_articles[doc], self.doc_labels[doc], score)
+            for doc, score in top
+        ]
+
+    def nbytes(self) -> int:
+        """Approximate size of the postings and per-doc arrays."""
+        arrays = self.post_docs + self.post_tfs + self.doc_terms + [self.df, self.doc_len]
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.deleted)
+
+    def save(self, path: str) -> None:
+        """
+        Persist as <path>/index.json (vocabulary, doc table, lengths) plus
+        <path>/postings.bin (all arrays back to back, in the order described by index.json).
+        Tombstones are compacted away first.
+        """
+        self.compact()
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+
+        vocab = sorted(self.terms, key=self.terms.get)
+        meta = {
+            "version": 1,
+            "byteorder": sys.byteorder,
+            "k1": self.k1,
+            "b": self.b,
+            "terms": vocab,
+            "postings_len": [len(p) for p in self.post_docs],
+            "doc_chunk_ids": self.doc_chunk_ids,
+            "doc_articles": self.doc_articles,
+            "doc_labels": self.doc_labels,
+            "doc_terms_len": [len(t) for t in self.doc_terms],
+        }
+        with (out / "postings.bin").open("wb") as f:
+            self.df.tofile(f)
+            self.doc_len.tofile(f)
+            for docs, tfs in zip(self.post_docs, self.post_tfs):
+                docs.tofile(f)
+                tfs.tofile(f)
+            for t in self.doc_terms:
+                t.tofile(f)
+        (out / "index.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str) -> "Bm25Index":
+        src = Path(path)
+        meta = json.loads((src / "index.json").read_text(encoding="utf-8"))
+        idx = cls(k1=meta["k1"], b=meta["b"])
+
+        swap = meta["byteorder"] != sys.byteorder
+        n_terms, n_docs = len(meta["terms"]), len(meta["doc_chunk_ids"])
+
+        with (src / "postings.bin").open("rb") as f:
+            def read(n: int) -> array:
+                a = array("I")
+                if n:
+                    a.fromfile(f, n)
+                    if swap:
+                        a.byteswap()
+                return a
+
+            idx.df = read(n_terms)
+            idx.doc_len = read(n_docs)
+            for n in meta["postings_len"]:
+                idx.post_docs.append(read(n))
+                idx.post_tfs.append(read(n))
+            idx.doc_terms = [read(n) for n in meta["doc_terms_len"]]
+
+        idx.terms = {t: i for i, t in enumerate(meta["terms"])}
+        idx.doc_chunk_ids = meta["doc_chunk_ids"]
+        idx.doc_articles = meta["doc_articles"]
+        idx.doc_labels = meta["doc_labels"]
+        idx.deleted = bytearray(n_docs)
+        for doc, article_id in enumerate(idx.doc_articles):
+            idx.article_docs.setdefault(article_id, []).append(doc)
+        idx.live_docs = n_docs
+        idx.total_len = sum(idx.doc_len)
+        return idx
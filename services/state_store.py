@@ -0,0 +1,68 @@
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+from services.state_store_gcs import read_state_from_gcs, write_state_to_gcs
+from services.uploader import load_state, save_state
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; writers are then only serialised within a process
+    fcntl = None
+
+
+class StateStore:
+    """
+    The pipeline state (article key -> {hash, file_ids}, vector_store_id, cutoffs): the
+    JSON file at `path`, or the `gcs_blob` object in `gcs_bucket` when a bucket is set
+    (`path` then holds a local copy of the last state read or written).
+
+    Every writer (daily run, ingest_one, the webhook service) goes through `update`, which
+    re-reads the current state and applies its change to that, so concurrent writers merge
+    instead of overwriting each other with the snapshot they started from.
+    """
+
+    def __init__(self, path: str = "data/state.json", *, gcs_bucket: Optional[str] = None, gcs_blob: str = "optibot/state.json"):
+        self.path = path
+        self.gcs_bucket = gcs_bucket
+        self.gcs_blob = gcs_blob
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict:
+        if not self.gcs_bucket:
+            return load_state(self.path)
+        state, _ = read_state_from_gcs(self.gcs_bucket, self.gcs_blob)
+        save_state(state, self.path)
+        return state
+
+    def update(self, change: Callable[[Dict], None]) -> Dict:
+        """
+        Apply `change` to the current state in place and save it; returns the saved state.
+        Writers sharing the local file are serialised by a lock file next to it (threads
+        and processes alike). With GCS the write is conditional on the generation read,
+        and `change` is re-applied to the newer state if another writer saved first, so
+        it must not have side effects beyond the state it is given.
+        """
+        with self._locked():
+            if not self.gcs_bucket:
+                state = load_state(self.path)
+                change(state)
+                save_state(state, self.path)
+                return state
+
+            while True:
+                state, generation = read_state_from_gcs(self.gcs_bucket, self.gcs_blob)
+                change(state)
+                if write_state_to_gcs(self.gcs_bucket, self.gcs_blob, state, generation):
+                    save_state(state, self.path)
+                    return state
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        lock_path = Path(self.path).with_name(Path(self.path).name + ".lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, lock_path.open("a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+            yield
@@ -1,8 +1,12 @@
 import json
 from pathlib import Path
-from google.cloud import storage
+from typing import Tuple
+
+# google.cloud.storage is imported per call so runs without GCS_BUCKET never load it
 
 def load_state_from_gcs(bucket: str, blob: str, local_path: str) -> dict:
+    from google.cloud import storage
+
     p = Path(local_path)
     p.parent.mkdir(parents=True, exist_ok=True)
 
@@ -17,8 +21,48 @@ def load_state_from_gcs(bucket: str, blob: str, local_path: str) -> dict:
     return json.loads(p.read_text(encoding="utf-8"))
 
 def save_state_to_gcs(bucket: str, blob: str, local_path: str) -> None:
+    from google.cloud import storage
+
     p = Path(local_path)
     client = storage.Client()
     b = client.bucket(bucket)
     bl = b.blob(blob)
     bl.upload_from_filename(str(p), content_type="application/json")
+
+def read_state_from_gcs(bucket: str, blob: str) -> Tuple[dict, int]:
+    """The state and its object generation (0 when the blob does not exist yet)."""
+    from google.api_core.exceptions import PreconditionFailed
+    from google.cloud import storage
+
+    client = storage.Client()
+    b = client.bucket(bucket)
+    while True:
+        bl = b.get_blob(blob)
+        if bl is None:
+            return {}, 0
+        try:
+            # pinned to the generation just looked up, so the pair stays consistent
+            data = bl.download_as_bytes(if_generation_match=bl.generation)
+        except PreconditionFailed:
+            continue  # overwritten in between; look it up again
+        return json.loads(data), bl.generation
+
+def write_state_to_gcs(bucket: str, blob: str, state: dict, generation: int) -> bool:
+    """
+    Upload `state` only if the blob is still at `generation` (0: it must not exist).
+    False when another writer saved first; the caller re-reads and retries.
+    """
+    from google.api_core.exceptions import PreconditionFailed
+    from google.cloud import storage
+
+    client = storage.Client()
+    bl = client.bucket(bucket).blob(blob)
+    try:
+        bl.upload_from_string(
+            json.dumps(state, ensure_ascii=False, indent=2),
+            content_type="application/json",
+            if_generation_match=generation,
+        )
+    except PreconditionFailed:
+        return False
+    return True
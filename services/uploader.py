@@ -1,14 +1,22 @@
 import hashlib
+import io
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+if TYPE_CHECKING:
+    from services.batch_tracker import BatchTracker, TrackedBatch
+    from services.chunk import Chunk
+    from services.state_store import StateStore
+
 
 # Allow overriding the endpoint (e.g. when using a proxy/Azure); fall back to public API
 BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
@@ -50,7 +58,10 @@ def load_state(path: str = "data/state.json") -> Dict:
 def save_state(state: Dict, path: str = "data/state.json") -> None:
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    # replaced atomically: readers that do not take the state lock never see a partial file
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, p)
 
 
 def compute_article_hash(article_chunk_dir: Path) -> str:
@@ -63,21 +74,50 @@ def compute_article_hash(article_chunk_dir: Path) -> str:
     return sha.hexdigest()
 
 
+def compute_chunks_hash(chunk_texts: List[str]) -> str:
+    """
+    Same hash as `compute_article_hash` over the chunk tree `write_chunks` would produce,
+    computed from memory, so switching between the two paths does not force re-uploads.
+    """
+    sha = hashlib.sha256()
+    for text in chunk_texts:
+        sha.update(text.encode("utf-8"))
+        sha.update(b"\n---\n")
+    return sha.hexdigest()
+
+
+def _article_dirs(chunk_root: Path, locales: Optional[List[str]] = None) -> List[Tuple[str, Path]]:
+    """
+    (article_key, dir) pairs under the chunk tree. Default-locale articles are
+    <root>/<article_id>; `locales` lists the other locales, stored under
+    <root>/<locale>/<article_id> and keyed "<locale>/<article_id>" (which is also the
+    dir's path relative to the root).
+    """
+    locales = locales or []
+    out = [(p.name, p) for p in sorted(chunk_root.iterdir()) if p.is_dir() and p.name not in locales]
+    for locale in locales:
+        locale_root = chunk_root / locale
+        if not locale_root.is_dir():
+            continue
+        out.extend((f"{locale}/{p.name}", p) for p in sorted(locale_root.iterdir()) if p.is_dir())
+    return out
+
+
 def collect_delta_articles(
     chunk_root: str = "data/chunks",
     state_path: str = "data/state.json",
+    locales: Optional[List[str]] = None,
 ) -> Tuple[List[str], List[str], List[str], Dict]:
     """
     Return: (added_ids, updated_ids, skipped_ids, state)
-    State keyed by article_id -> {hash, file_ids}
+    State keyed by article_id (or "<locale>/<article_id>" for non-default locales) -> {hash, file_ids}
     """
     state = load_state(state_path)
     chunk_root_p = Path(chunk_root)
     chunk_root_p.mkdir(parents=True, exist_ok=True)
 
     added, updated, skipped = [], [], []
-    for article_dir in sorted([p for p in chunk_root_p.iterdir() if p.is_dir()]):
-        article_id = article_dir.name
+    for article_id, article_dir in _article_dirs(chunk_root_p, locales):
         h = compute_article_hash(article_dir)
         prev = state.get(article_id)
 
@@ -95,15 +135,26 @@ def upload_file(path: Path) -> str:
     """
     Upload file to Files API. Purpose must be 'assistants' for Assistants/File Search usage.
     """
-    session = make_openai_session()
     with path.open("rb") as f:
-        r = session.post(
-            f"{BASE_URL}/files",
-            headers=_headers(beta_assistants_v2=False),  # files endpoint doesn't need beta header
-            files={"file": (path.name, f)},
-            data={"purpose": "assistants"},
-            timeout=(30, 120),
-        )
+        return _post_file(path.name, f)
+
+
+def upload_bytes(filename: str, data: bytes) -> str:
+    """
+    Upload an in-memory payload to the Files API as `filename` (no temp file on disk).
+    """
+    return _post_file(filename, io.BytesIO(data))
+
+
+def _post_file(filename: str, fileobj) -> str:
+    session = make_openai_session()
+    r = session.post(
+        f"{BASE_URL}/files",
+        headers=_headers(beta_assistants_v2=False),  # files endpoint doesn't need beta header
+        files={"file": (filename, fileobj)},
+        data={"purpose": "assistants"},
+        timeout=(30, 120),
+    )
     r.raise_for_status()
     return r.json()["id"]
 
@@ -113,25 +164,154 @@ def upload_delta_articles(
     state_path: str = "data/state.json",
     vector_store_name: str = "optisigns-kb",
     delete_old_from_vector_store: bool = True,
+    locales: Optional[List[str]] = None,
 ) -> None:
-    added, updated, skipped, state = collect_delta_articles(chunk_root, state_path)
+    from services.state_store import StateStore
+
+    added, updated, skipped, state = collect_delta_articles(chunk_root, state_path, locales)
 
-    vs_id = get_or_create_vector_store_id(state, name=vector_store_name)
+    store = StateStore(state_path)
+    vs_id = ensure_vector_store_id(store, state, name=vector_store_name)
 
     print(f"[delta] added={len(added)} updated={len(updated)} skipped={len(skipped)} vs_id={vs_id}")
 
-    for article_id in added + updated:
-        new_file_ids = upload_article_chunks_to_vector_store(
-            article_id=article_id,
-            vector_store_id=vs_id,
-            chunk_root=chunk_root,
+    _upload_articles(
+        ((article_id, None) for article_id in added + updated),
+        state=state,
+        vector_store_id=vs_id,
+        chunk_root=chunk_root,
+        store=store,
+        delete_old_from_vector_store=delete_old_from_vector_store,
+    )
+
+
+def upload_chunked_articles(
+    articles: Iterable[Tuple[str, List["Chunk"]]],
+    *,
+    state_store: "StateStore",
+    vector_store_name: str = "optisigns-kb",
+    delete_old_from_vector_store: bool = True,
+    force: bool = False,
+) -> None:
+    """
+    Upload articles straight from `chunk_markdown` output, without a chunk tree on disk.
+    `articles` yields (article_key, chunks) and is consumed lazily, so uploads start while
+    later articles are still being converted. Unchanged articles are skipped unless `force`.
+
+    Results are merged into the state as it is in `state_store` when saving, so runs on
+    disjoint articles (daily run, ingest_one, serve workers) can share one state.
+    """
+    state = state_store.load()
+    vs_id = ensure_vector_store_id(state_store, state, name=vector_store_name)
+
+    counts = {"upload": 0, "skipped": 0}
+    hashes: Dict[str, str] = {}
+
+    def changed():
+        for article_id, chunks in articles:
+            texts = [ch.text for ch in chunks]
+            h = compute_chunks_hash(texts)
+            if not texts or (not force and (state.get(article_id) or {}).get("hash") == h):
+                counts["skipped"] += 1
+                continue
+            counts["upload"] += 1
+            hashes[article_id] = h
+            yield article_id, texts
+
+    try:
+        _upload_articles(
+            changed(),
             state=state,
+            vector_store_id=vs_id,
+            chunk_root="",
+            store=state_store,
             delete_old_from_vector_store=delete_old_from_vector_store,
+            hashes=hashes,
         )
-        article_hash = compute_article_hash(Path(chunk_root) / article_id)
-        state[article_id] = {"hash": article_hash, "file_ids": new_file_ids}
+    finally:
+        print(f"[memory] upload={counts['upload']} skipped={counts['skipped']} vs_id={vs_id}")
+
+
+def _upload_articles(
+    articles: Iterable[Tuple[str, Optional[List[str]]]],
+    *,
+    state: Dict,
+    vector_store_id: str,
+    chunk_root: str,
+    store: "StateStore",
+    delete_old_from_vector_store: bool,
+    hashes: Optional[Dict[str, str]] = None,
+) -> None:
+    from services.batch_tracker import BatchTracker
+
+    # may be filled lazily while `articles` is consumed, so keep the caller's dict
+    if hashes is None:
+        hashes = {}
 
-    save_state(state, state_path)
+    # Batches are processed server-side while the next articles upload; state is only
+    # updated for articles whose batch completed.
+    uploaded: Dict[str, Dict] = {}
+    with BatchTracker() as tracker:
+        try:
+            for article_id, chunk_texts in articles:
+                new_file_ids = upload_article_chunks_to_vector_store(
+                    article_id=article_id,
+                    vector_store_id=vector_store_id,
+                    chunk_root=chunk_root,
+                    state=state,
+                    delete_old_from_vector_store=delete_old_from_vector_store,
+                    tracker=tracker,
+                    chunk_texts=chunk_texts,
+                )
+                article_hash = hashes.get(article_id) or compute_article_hash(Path(chunk_root) / article_id)
+                uploaded[article_id] = {"hash": article_hash, "file_ids": new_file_ids}
+        finally:
+            # Also when the stream (crawl, convert) or an upload raised: batches already
+            # submitted still complete server-side, so record them before re-raising.
+            batches = tracker.wait_all()
+            tracker.report()
+            failed = _commit_batches(
+                batches,
+                uploaded,
+                store=store,
+                vector_store_id=vector_store_id,
+                delete_old_from_vector_store=delete_old_from_vector_store,
+            )
+
+    if failed:
+        raise RuntimeError(f"Vector store file batch failed: {[(b.key, b.result) for b in failed]}")
+
+
+def _commit_batches(
+    batches: List["TrackedBatch"],
+    uploaded: Dict[str, Dict],
+    *,
+    store: "StateStore",
+    vector_store_id: str,
+    delete_old_from_vector_store: bool,
+) -> List["TrackedBatch"]:
+    """Save the completed batches to state and clean up the files they replace; returns the failed ones."""
+    completed = [b for b in batches if b.status == "completed" and b.key in uploaded]
+    failed = [b for b in batches if not (b.status == "completed" and b.key in uploaded)]
+
+    superseded: List[str] = []
+
+    def merge(state: Dict) -> None:
+        # applied to the state as saved now, not as loaded when the run started: other
+        # writers may have replaced these articles' files since
+        superseded.clear()
+        state.setdefault("vector_store_id", vector_store_id)
+        for b in completed:
+            superseded.extend((state.get(b.key) or {}).get("file_ids", []))
+            state[b.key] = uploaded[b.key]
+
+    if completed:
+        store.update(merge)
+
+    # State already points at the new files; anything left behind here is found by GC later.
+    if delete_old_from_vector_store:
+        cleanup_files(vector_store_id, superseded)
+    return failed
 
 
 def create_file_batch(vector_store_id: str, file_ids: List[str]) -> str:
@@ -150,28 +330,38 @@ def create_file_batch(vector_store_id: str, file_ids: List[str]) -> str:
     return r.json()["id"]
 
 
+def get_file_batch(vector_store_id: str, batch_id: str, session: Optional[requests.Session] = None) -> Dict:
+    """
+    Fetch the current status of a file batch (single GET, no retry loop).
+    """
+    session = session or make_openai_session()
+    r = session.get(
+        f"{BASE_URL}/vector_stores/{vector_store_id}/file_batches/{batch_id}",
+        headers=_headers(beta_assistants_v2=True),
+        timeout=(15, 60),  # connect, read
+    )
+    r.raise_for_status()
+    return r.json()
+
+
 def poll_file_batch(vector_store_id: str, batch_id: str, interval: int = 3, max_wait_sec: int = 900) -> Dict:
     """
     Poll a file batch with slower cadence and tolerant timeouts.
     - interval: poll delay (seconds), will backoff up to ~15s on errors
     - max_wait_sec: overall timeout (default 15 minutes)
+
+    Blocks until the batch finishes; use `services.batch_tracker.BatchTracker` to track
+    many batches without blocking.
     """
     session = make_openai_session()
     start = time.time()
-    url = f"{BASE_URL}/vector_stores/{vector_store_id}/file_batches/{batch_id}"
 
     while True:
         if time.time() - start > max_wait_sec:
             raise TimeoutError(f"poll_file_batch timeout after {max_wait_sec}s: {batch_id}")
 
         try:
-            r = session.get(
-                url,
-                headers=_headers(beta_assistants_v2=True),
-                timeout=(15, 60),  # connect, read
-            )
-            r.raise_for_status()
-            data = r.json()
+            data = get_file_batch(vector_store_id, batch_id, session=session)
         except (requests.exceptions.ConnectTimeout, requests.exceptions.ReadTimeout) as e:
             print(f"[poll] timeout: {e} -> sleep {interval}s")
             time.sleep(interval)
@@ -193,11 +383,11 @@ def poll_file_batch(vector_store_id: str, batch_id: str, interval: int = 3, max_
         time.sleep(interval)
 
 
-def delete_vector_store_file(vector_store_id: str, file_id: str) -> None:
+def delete_vector_store_file(vector_store_id: str, file_id: str, session: Optional[requests.Session] = None) -> None:
     """
     Remove file from vector store (does NOT delete the file object).
     """
-    session = make_openai_session()
+    session = session or make_openai_session()
     r = session.delete(
         f"{BASE_URL}/vector_stores/{vector_store_id}/files/{file_id}",
         headers=_headers(beta_assistants_v2=True),
@@ -208,43 +398,168 @@ def delete_vector_store_file(vector_store_id: str, file_id: str) -> None:
         r.raise_for_status()
 
 
+def delete_file(file_id: str, session: Optional[requests.Session] = None) -> None:
+    """
+    Delete the File object itself (frees Files storage).
+    """
+    session = session or make_openai_session()
+    r = session.delete(
+        f"{BASE_URL}/files/{file_id}",
+        headers=_headers(beta_assistants_v2=False),
+        timeout=(15, 60),
+    )
+    if r.status_code not in (200, 204, 404):
+        r.raise_for_status()
+
+
+def cleanup_files(
+    vector_store_id: str,
+    file_ids: List[str],
+    *,
+    delete_file_objects: bool = True,
+    max_workers: int = 8,
+) -> List[str]:
+    """
+    Detach file_ids from the vector store and delete their File objects, concurrently.
+    Failures are logged, not raised; returns the file_ids that could not be cleaned up
+    (a later GC run picks them up).
+    """
+    if not file_ids:
+        return []
+
+    local = threading.local()
+
+    def _cleanup(fid: str) -> Optional[str]:
+        if not hasattr(local, "session"):
+            local.session = make_openai_session()
+        try:
+            delete_vector_store_file(vector_store_id, fid, session=local.session)
+            if delete_file_objects:
+                delete_file(fid, session=local.session)
+        except requests.exceptions.RequestException as e:
+            print(f"[cleanup] {fid} failed: {e}")
+            return fid
+        return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(file_ids))) as pool:
+        failed = [fid for fid in pool.map(_cleanup, file_ids) if fid]
+
+    print(f"[cleanup] removed={len(file_ids) - len(failed)} failed={len(failed)} delete_file_objects={delete_file_objects}")
+    return failed
+
+
+def _list_paginated(session: requests.Session, url: str, headers: Dict[str, str], params: Dict) -> List[Dict]:
+    out: List[Dict] = []
+    params = dict(params)
+    while True:
+        r = session.get(url, headers=headers, params=params, timeout=(15, 60))
+        r.raise_for_status()
+        data = r.json()
+        out.extend(data.get("data", []))
+        if not data.get("has_more") or not data.get("data"):
+            return out
+        params["after"] = data.get("last_id") or data["data"][-1]["id"]
+
+
+def list_vector_store_files(vector_store_id: str) -> List[Dict]:
+    """
+    List every file attached to the vector store (follows `has_more` pagination).
+    """
+    session = make_openai_session()
+    return _list_paginated(
+        session,
+        f"{BASE_URL}/vector_stores/{vector_store_id}/files",
+        _headers(beta_assistants_v2=True),
+        {"limit": 100},
+    )
+
+
+def list_vector_stores() -> List[Dict]:
+    """
+    List every vector store in the org (follows `has_more` pagination).
+    """
+    session = make_openai_session()
+    return _list_paginated(
+        session,
+        f"{BASE_URL}/vector_stores",
+        _headers(beta_assistants_v2=True),
+        {"limit": 100},
+    )
+
+
+def list_files(purpose: str = "assistants") -> List[Dict]:
+    """
+    List File objects for a purpose (follows `has_more` pagination).
+    """
+    session = make_openai_session()
+    return _list_paginated(
+        session,
+        f"{BASE_URL}/files",
+        _headers(beta_assistants_v2=False),
+        {"purpose": purpose, "limit": 10000},
+    )
+
+
 def upload_article_chunks_to_vector_store(
     article_id: str,
     vector_store_id: str,
     chunk_root: str,
     state: Dict,
     delete_old_from_vector_store: bool = True,
+    tracker: Optional["BatchTracker"] = None,
+    chunk_texts: Optional[List[str]] = None,
 ) -> List[str]:
     """
     Upload all chunk files for this article_id and attach them to the vector store.
     Returns new file_ids.
-    """
-    article_dir = Path(chunk_root) / article_id
-    chunk_files = sorted(article_dir.glob("*.md"))
-    if not chunk_files:
-        raise FileNotFoundError(f"No chunk files found for article_id={article_id} at {article_dir}")
 
-    # If updated: remove previous file_ids from the vector store to avoid stale duplicates
+    With `chunk_texts`, chunks are uploaded from memory under the same file names the
+    chunk tree would use, and chunk_root is not read.
+
+    With a `tracker`, the file batch is handed to it and this returns right after
+    creating the batch; otherwise it blocks on `poll_file_batch`.
+    """
     prev_file_ids = (state.get(article_id) or {}).get("file_ids", [])
-    if delete_old_from_vector_store and prev_file_ids:
-        for fid in prev_file_ids:
-            delete_vector_store_file(vector_store_id, fid)
 
-    # Upload chunk files -> file_ids
+    # Upload chunks -> file_ids
     new_file_ids = []
-    for fp in chunk_files:
-        fid = upload_file(fp)
-        new_file_ids.append(fid)
-        print(f"[upload] {article_id} {fp.name} -> {fid}")
+    if chunk_texts is not None:
+        if not chunk_texts:
+            raise ValueError(f"No chunks given for article_id={article_id}")
+        base_id = article_id.rsplit("/", 1)[-1]  # "<locale>/<id>" keys
+        for i, text in enumerate(chunk_texts, 1):
+            name = f"{base_id}_{i:04d}.md"
+            fid = upload_bytes(name, text.encode("utf-8"))
+            new_file_ids.append(fid)
+            print(f"[upload] {article_id} {name} -> {fid}")
+    else:
+        article_dir = Path(chunk_root) / article_id
+        chunk_files = sorted(article_dir.glob("*.md"))
+        if not chunk_files:
+            raise FileNotFoundError(f"No chunk files found for article_id={article_id} at {article_dir}")
+
+        for fp in chunk_files:
+            fid = upload_file(fp)
+            new_file_ids.append(fid)
+            print(f"[upload] {article_id} {fp.name} -> {fid}")
 
     # Attach in one batch
     batch_id = create_file_batch(vector_store_id, new_file_ids)
     print(f"[vs] created file_batch={batch_id} for article_id={article_id}")
+    if tracker is not None:
+        # caller cleans up prev_file_ids once the tracked batch completes
+        tracker.add(vector_store_id, batch_id, key=article_id)
+        return new_file_ids
+
     result = poll_file_batch(vector_store_id, batch_id)
 
     if result.get("status") != "completed":
         raise RuntimeError(f"Vector store file batch failed: {result}")
 
+    # If updated: remove previous files only now, so the article never disappears from the store
+    if delete_old_from_vector_store and prev_file_ids:
+        cleanup_files(vector_store_id, prev_file_ids)
+
     return new_file_ids
 
 
@@ -259,10 +574,14 @@ def create_vector_store(name: str) -> str:
     r.raise_for_status()
     return r.json()["id"]
 
-def get_or_create_vector_store_id(state: Dict, *, name: str = "optisigns-kb") -> str:
+def ensure_vector_store_id(store: "StateStore", state: Dict, *, name: str = "optisigns-kb") -> str:
+    """
+    The state's vector store id; creates the store and publishes its id when there is
+    none yet. If another writer published one first, that one is used.
+    """
     vs_id = state.get("vector_store_id")
-    if vs_id:
-        return vs_id
-    vs_id = create_vector_store(name)
-    state["vector_store_id"] = vs_id
+    if not vs_id:
+        created = create_vector_store(name)
+        vs_id = store.update(lambda s: s.setdefault("vector_store_id", created))["vector_store_id"]
+        state["vector_store_id"] = vs_id
     return vs_id
@@ -0,0 +1,101 @@
+import re
+import time
+from typing import TYPE_CHECKING, Dict, List, Set
+
+from services.uploader import cleanup_files, list_files, list_vector_store_files, list_vector_stores
+
+if TYPE_CHECKING:
+    from services.state_store import StateStore
+
+# Chunk files are uploaded as <article_id>_NNNN.md; only those are GC candidates among
+# unattached Files. Other deployments (e.g. staging) upload the same names, so files
+# attached to any other vector store are skipped too; a chunk File another deployment
+# uploaded but never attached is still indistinguishable from ours.
+_CHUNK_FILENAME_RE = re.compile(r"^\d+_\d{4}\.md$")
+
+
+def known_file_ids(state: Dict) -> Set[str]:
+    """All file_ids referenced by article entries in the state."""
+    ids: Set[str] = set()
+    for v in state.values():
+        if isinstance(v, dict):
+            ids.update(v.get("file_ids") or [])
+    return ids
+
+
+def find_orphans(
+    state: Dict,
+    *,
+    include_unattached_files: bool = False,
+    min_age_sec: int = 3600,
+) -> Dict[str, List[str]]:
+    """
+    Diff the vector store (and optionally the Files API) against the state.
+    Returns {"attached": [...], "unattached": [...]} file_ids not referenced by the state.
+    Unattached candidates are chunk-named Files attached to no vector store at all.
+    Files younger than `min_age_sec` are never orphans: they may belong to a run (or the
+    webhook service) that is between creating its file batch and saving its state.
+    """
+    vs_id = state.get("vector_store_id")
+    if not vs_id:
+        raise ValueError("state has no vector_store_id")
+
+    known = known_file_ids(state)
+    cutoff = time.time() - min_age_sec
+    attached = list_vector_store_files(vs_id)
+    attached_ids = {f["id"] for f in attached}
+    orphans = {
+        "attached": sorted(
+            f["id"] for f in attached if f["id"] not in known and (f.get("created_at") or 0) <= cutoff
+        ),
+        "unattached": [],
+    }
+
+    if include_unattached_files:
+        elsewhere: Set[str] = set()
+        for vs in list_vector_stores():
+            if vs["id"] != vs_id:
+                elsewhere.update(f["id"] for f in list_vector_store_files(vs["id"]))
+        for f in list_files("assistants"):
+            fid = f["id"]
+            if fid in known or fid in attached_ids or fid in elsewhere:
+                continue
+            if not _CHUNK_FILENAME_RE.match(f.get("filename") or ""):
+                continue
+            if (f.get("created_at") or 0) > cutoff:
+                continue
+            orphans["unattached"].append(fid)
+
+    print(
+        f"[gc] vs_id={vs_id} attached={len(attached_ids)} known={len(known)} "
+        f"orphan_attached={len(orphans['attached'])} orphan_unattached={len(orphans['unattached'])}"
+    )
+    return orphans
+
+
+def gc_vector_store(
+    state_store: "StateStore",
+    *,
+    dry_run: bool = False,
+    include_unattached_files: bool = False,
+    min_age_sec: int = 3600,
+    max_workers: int = 8,
+) -> Dict[str, List[str]]:
+    """
+    Remove files left behind by crashed or interrupted runs: detach vector store files
+    that the state does not reference and delete their File objects. `state_store` must
+    be the deployed state (GCS when the pipeline keeps it there), not a stale local copy.
+    """
+    state = state_store.load()
+    orphans = find_orphans(state, include_unattached_files=include_unattached_files, min_age_sec=min_age_sec)
+
+    if dry_run:
+        for kind, ids in orphans.items():
+            for fid in ids:
+                print(f"[gc] would remove {kind} {fid}")
+        return orphans
+
+    vs_id = state["vector_store_id"]
+    # detaching an unattached file 404s, which delete_vector_store_file ignores
+    cleanup_files(vs_id, orphans["attached"] + orphans["unattached"], max_workers=max_workers)
+    return orphans
@@ -0,0 +1,272 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+import requests
+
+# Zendesk event types that mean "the article content may have changed"
+INGEST_EVENT_TYPES = (
+    "article.published",
+    "article.updated",
+    "article.created",
+    "article.translation_published",
+    "article.translation_updated",
+)
+
+
+def parse_event(
+    event: Dict, default_locale: str, locales: Optional[Collection[str]] = None
+) -> Optional[Tuple[str, str]]:
+    """
+    (locale, article_id) for an article change event, or None if the event is not one or
+    its locale is not in `locales` (when given).
+
+    Accepts Zendesk Help Center webhook payloads ({"type": "zen:event-type:article.published",
+    "detail": {"id": ...}, "event": {"locale": ...}}) and the plain {"article_id", "locale"}
+    form used by the simulator.
+    """
+    if "article_id" in event:
+        locale, article_id = event.get("locale") or default_locale, event["article_id"]
+    else:
+        etype = str(event.get("type") or "")
+        if not etype.endswith(INGEST_EVENT_TYPES):
+            return None
+        detail = event.get("detail") or {}
+        body = event.get("event") or {}
+        article_id = detail.get("id") or body.get("article_id")
+        if not article_id:
+            return None
+        locale = body.get("locale") or detail.get("locale") or default_locale
+
+    if locales is not None and locale not in locales:
+        return None
+    return locale, str(article_id)
+
+
+def verify_signature(secret: str, body: bytes, signature: str, timestamp: str) -> bool:
+    """Zendesk webhook signature: base64(HMAC-SHA256(secret, timestamp + body))."""
+    expected = base64.b64encode(hmac.new(secret.encode(), timestamp.encode() + body, hashlib.sha256).digest()).decode()
+    return hmac.compare_digest(expected, signature or "")
+
+
+class EventCoalescer:
+    """
+    Debounce article change events and run them through `process(locale, article_ids)`.
+
+    Every event for an article pushes its due time to now + `debounce_sec` (but never past
+    `max_delay_sec` after its first pending event), so a burst of edits becomes one ingest.
+    Due articles are grouped per locale into batches of at most `max_batch` and run on a
+    pool of `max_workers` threads. An article is never processed twice at once: events that
+    arrive while it is in flight are held until that run finishes.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[str, List[str]], None],
+        *,
+        debounce_sec: float = 30.0,
+        max_delay_sec: float = 300.0,
+        max_workers: int = 2,
+        max_batch: int = 100,
+    ):
+        self.process = process
+        self.debounce_sec = debounce_sec
+        self.max_delay_sec = max_delay_sec
+        self.max_workers = max_workers
+        self.max_batch = max_batch
+        # articles falling due within this window of each other go out in the same batch
+        self._grace = min(1.0, debounce_sec / 10)
+
+        self._cond = threading.Condition()
+        self._due: Dict[Tuple[str, str], float] = {}
+        self._first_seen: Dict[Tuple[str, str], float] = {}
+        self._in_flight: set = set()
+        self._active = 0
+        self._stopping = False
+        self.counters = {"events": 0, "coalesced": 0, "batches": 0, "articles": 0, "errors": 0}
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._thread = threading.Thread(target=self._run, name="coalescer", daemon=True)
+        self._thread.start()
+
+    def submit(self, locale: str, article_id: str) -> None:
+        key = (locale, article_id)
+        now = time.time()
+        with self._cond:
+            self.counters["events"] += 1
+            if key in self._due:
+                self.counters["coalesced"] += 1
+            first = self._first_seen.setdefault(key, now)
+            self._due[key] = min(now + self.debounce_sec, first + self.max_delay_sec)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {**self.counters, "pending": len(self._due), "in_flight": len(self._in_flight)}
+
+    def close(self, flush: bool = True) -> None:
+        """Stop accepting work; with `flush`, pending articles are processed immediately first."""
+        with self._cond:
+            if flush:
+                for key in self._due:
+                    self._due[key] = 0.0
+            else:
+                self._due.clear()
+                self._first_seen.clear()
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def _take_due(self, now: float) -> List[Tuple[str, List[str]]]:
+        """Pop due, not-in-flight articles as per-locale batches (caller holds the lock)."""
+        ready = sorted((k for k, due in self._due.items() if due <= now + self._grace and k not in self._in_flight), key=self._due.get)
+        by_locale: Dict[str, List[str]] = {}
+        for locale, article_id in ready:
+            by_locale.setdefault(locale, []).append(article_id)
+
+        batches = []
+        for locale, ids in by_locale.items():
+            for i in range(0, len(ids), self.max_batch):
+                batches.append((locale, ids[i:i + self.max_batch]))
+
+        # leave the rest pending (still coalescing) until a worker frees up
+        batches = batches[: max(0, self.max_workers - self._active)]
+        for locale, ids in batches:
+            for article_id in ids:
+                key = (locale, article_id)
+                del self._due[key]
+                del self._first_seen[key]
+                self._in_flight.add(key)
+        return batches
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.time()
+                    batches = self._take_due(now) if self._active < self.max_workers else []
+                    if batches:
+                        break
+                    if self._stopping and not self._due and not self._active:
+                        return
+                    waiting = [due for k, due in self._due.items() if k not in self._in_flight]
+                    timeout = (min(waiting) - self._grace - now) if waiting and self._active < self.max_workers else None
+                    self._cond.wait(timeout=max(timeout, 0.01) if timeout is not None else 1.0)
+                self._active += len(batches)
+                self.counters["batches"] += len(batches)
+
+            for locale, ids in batches:
+                self._pool.submit(self._process_batch, locale, ids)
+
+    def _process_batch(self, locale: str, ids: List[str]) -> None:
+        t0 = time.time()
+        try:
+            self.process(locale, ids)
+            ok = True
+        except Exception as e:  # keep the service alive; the next event for these articles retries
+            print(f"[serve] locale={locale} ids={ids} failed: {e!r}")
+            ok = False
+        with self._cond:
+            for article_id in ids:
+                self._in_flight.discard((locale, article_id))
+            self._active -= 1
+            self.counters["articles" if ok else "errors"] += len(ids)
+            self._cond.notify_all()
+        print(f"[serve] locale={locale} articles={len(ids)} ok={ok} took={time.time() - t0:.1f}s")
+
+
+def make_server(
+    coalescer: EventCoalescer,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    default_locale: str = "en-us",
+    locales: Optional[Collection[str]] = None,
+    secret: Optional[str] = None,
+) -> ThreadingHTTPServer:
+    """
+    HTTP endpoint: POST /events with one event or a JSON list of events; GET /healthz for stats.
+    Events for locales outside `locales` (when given) are ignored.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):  # keep stdout to our own [serve] lines
+            pass
+
+        def _reply(self, code: int, payload: Dict) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/healthz":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, coalescer.stats())
+
+        def do_POST(self):
+            if self.path != "/events":
+                return self._reply(404, {"error": "not found"})
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            if secret and not verify_signature(
+                secret,
+                body,
+                self.headers.get("X-Zendesk-Webhook-Signature", ""),
+                self.headers.get("X-Zendesk-Webhook-Signature-Timestamp", ""),
+            ):
+                return self._reply(401, {"error": "bad signature"})
+
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                return self._reply(400, {"error": "invalid json"})
+
+            events = payload if isinstance(payload, list) else [payload]
+            accepted = 0
+            for event in events:
+                parsed = parse_event(event, default_locale, locales) if isinstance(event, dict) else None
+                if parsed:
+                    coalescer.submit(*parsed)
+                    accepted += 1
+            self._reply(202, {"accepted": accepted, "ignored": len(events) - accepted})
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def simulate(
+    url: str,
+    article_ids: List[str],
+    *,
+    locale: str = "en-us",
+    edits_per_article: int = 5,
+    edit_interval_sec: float = 0.5,
+) -> None:
+    """
+    Post bursts of Zendesk-shaped article.updated events: every article is "edited"
+    `edits_per_article` times, `edit_interval_sec` apart.
+    """
+    session = requests.Session()
+    for n in range(edits_per_article):
+        for article_id in article_ids:
+            event = {
+                "type": "zen:event-type:article.updated",
+                "subject": f"zen:article:{article_id}",
+                "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "detail": {"id": str(article_id)},
+                "event": {"locale": locale},
+            }
+            r = session.post(url, json=event, timeout=10)
+            r.raise_for_status()
+        print(f"[simulate] burst {n + 1}/{edits_per_article} articles={len(article_ids)}")
+        if n + 1 < edits_per_article:
+            time.sleep(edit_interval_sec)
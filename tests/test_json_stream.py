@@ -0,0 +1,78 @@
+import json
+import unittest
+
+from services.json_stream import iter_array_items
+
+# Zendesk-shaped page: floats, exponents, negatives, literals, escapes and non-ASCII text
+PAGE = {
+    "articles": [
+        {
+            "id": 360051014713,
+            "title": "Pairing a screen — «Quick start» ✓",
+            "body": '<p>Tab\tand "quotes" \\ and é中</p>',
+            "vote_sum": -3,
+            "score": 2.5,
+            "ratio": 1e3,
+            "tiny": -0.5e-2,
+            "draft": False,
+            "promoted": True,
+            "section_id": None,
+            "label_names": ["setup", "pairing"],
+            "updated_at": "2024-05-01T12:00:00Z",
+        },
+        {"id": 7, "title": "", "body": "", "score": 0, "ratio": 12.75, "label_names": []},
+        123,
+        4.0e-10,
+    ],
+    "next_page": None,
+    "count": 4,
+    "score": 2.5,
+    "page_count": 1e0,
+    "per_page": 100,
+}
+
+
+def parse(chunks):
+    meta = {}
+    items = list(iter_array_items(chunks, "articles", meta))
+    return items, meta
+
+
+class IterArrayItemsTest(unittest.TestCase):
+    def assert_page(self, chunks, page):
+        items, meta = parse(chunks)
+        self.assertEqual(items, page["articles"])
+        self.assertEqual(meta, {k: v for k, v in page.items() if k != "articles"})
+
+    def test_every_split_offset(self):
+        for page in (PAGE, {"next_page": None, "count": 2, "articles": [1.5, 2e2]}):
+            for indent in (None, 2):
+                raw = json.dumps(page, ensure_ascii=False, indent=indent).encode("utf-8")
+                for i in range(len(raw) + 1):
+                    with self.subTest(indent=indent, split=i, at=raw[max(0, i - 8) : i + 8]):
+                        self.assert_page([raw[:i], raw[i:]], page)
+
+    def test_small_chunks(self):
+        raw = json.dumps(PAGE, ensure_ascii=False).encode("utf-8")
+        for size in (1, 2, 3, 7, 64):
+            with self.subTest(size=size):
+                self.assert_page([raw[i : i + size] for i in range(0, len(raw), size)], PAGE)
+
+    def test_numbers_cut_at_boundary(self):
+        self.assertEqual(parse([b'{"articles": [], "score": 2.', b"5}"]), ([], {"score": 2.5}))
+        self.assertEqual(parse([b'{"articles": [1e', b"3]}"]), ([1000.0], {}))
+        self.assertEqual(parse([b'{"articles": [1', b"23]}"]), ([123], {}))
+        self.assertEqual(parse([b'{"articles": [-', b"0.5e-", b"2]}"]), ([-0.005], {}))
+
+    def test_empty(self):
+        self.assertEqual(parse([b"{}"]), ([], {}))
+        self.assertEqual(parse([b'{"articles": [], "next_page": null}']), ([], {"next_page": None}))
+
+    def test_truncated_input_raises(self):
+        for raw in (b'{"articles": [{"id": 1}', b'{"articles": [1.', b'{"articles": [tr'):
+            with self.subTest(raw=raw), self.assertRaises(json.JSONDecodeError):
+                parse([raw])
+
+
+if __name__ == "__main__":
+    unittest.main()